@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+# pylint: disable=invalid-name
+
+from argparse import ArgumentParser
+from email.policy import SMTPUTF8
+from os import environ, pathsep, path, urandom
+from time import perf_counter
+import json
+import subprocess
+import sys
+import tracemalloc
+
+from dNG.data.rfc.email.encoded_payload_cache import EncodedPayloadCache
+from dNG.data.rfc.email.message import Message
+from dNG.data.rfc.email.part import Part
+
+class BenchmarkRfcEMail(object):
+    """
+Benchmark suite measuring part construction and message serialization
+throughput as well as peak memory usage and the cold start import time.
+Results can be stored as baseline and compared to detect regressions.
+
+Usage: python benchmark_rfc_email.py [--save-baseline] [--compare]
+                                     [--import-budget SECONDS]
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    DEFAULT_IMPORT_TIME_BUDGET = 0.075
+    """
+Default maximum cold start import time of "dNG.data.rfc.email.message" in
+seconds
+    """
+    DEFAULT_BASELINE_FILE_PATH_NAME = path.join(path.dirname(path.abspath(__file__)), "baseline.json")
+    """
+Default baseline file path and name
+    """
+    DEFAULT_SIZES = ( 1024, 65536, 1048576, 16777216 )
+    """
+Default payload sizes in bytes
+    """
+
+    def __init__(self, sizes = None, min_duration = 0.5):
+        """
+Constructor __init__(BenchmarkRfcEMail)
+
+:param sizes: Payload sizes in bytes
+:param min_duration: Minimum measured duration per scenario in seconds
+
+:since: v1.1.0
+        """
+
+        self.min_duration = min_duration
+        """
+Minimum measured duration per scenario in seconds
+        """
+        self.results = { }
+        """
+Benchmark results
+        """
+        self.sizes = (BenchmarkRfcEMail.DEFAULT_SIZES if (sizes is None) else sizes)
+        """
+Payload sizes in bytes
+        """
+    #
+
+    def compare(self, baseline, tolerance):
+        """
+Compares the results with the given baseline.
+
+:param baseline: Baseline results
+:param tolerance: Accepted relative deviation
+
+:return: (list) List of regression descriptions
+:since:  v1.1.0
+        """
+
+        _return = [ ]
+
+        for name in sorted(self.results):
+            if (name not in baseline): continue
+
+            result = self.results[name]
+            baseline_result = baseline[name]
+
+            if ("import_time" in result):
+                if (result['import_time'] > baseline_result['import_time'] * (1 + tolerance)):
+                    _return.append("{0}: import time {1:.2f} ms > baseline {2:.2f} ms".format(name,
+                                                                                           1000 * result['import_time'],
+                                                                                           1000 * baseline_result['import_time']
+                                                                                          ))
+                #
+
+                continue
+            #
+
+            if (result['throughput'] < baseline_result['throughput'] * (1 - tolerance)):
+                _return.append("{0}: throughput {1:.2f} MiB/s < baseline {2:.2f} MiB/s".format(name,
+                                                                                             result['throughput'],
+                                                                                             baseline_result['throughput']
+                                                                                            ))
+            #
+
+            if (result['peak_memory'] > baseline_result['peak_memory'] * (1 + tolerance)):
+                _return.append("{0}: peak memory {1:d} bytes > baseline {2:d} bytes".format(name,
+                                                                                           result['peak_memory'],
+                                                                                           baseline_result['peak_memory']
+                                                                                          ))
+            #
+        #
+
+        return _return
+    #
+
+    def get_import_budget_violations(self, budget):
+        """
+Returns the measured import times exceeding the given budget.
+
+:param budget: Maximum import time in seconds
+
+:return: (list) List of budget violation descriptions
+:since:  v1.1.0
+        """
+
+        return [ "{0}: import time {1:.2f} ms > budget {2:.2f} ms".format(name, 1000 * result['import_time'], 1000 * budget)
+                 for name, result in sorted(self.results.items())
+                 if ("import_time" in result and result['import_time'] > budget)
+               ]
+    #
+
+    def _measure(self, name, size, callback):
+        """
+Measures throughput and peak memory of the given callback.
+
+:param name: Scenario name
+:param size: Number of payload bytes processed per call
+:param callback: Callable to measure
+
+:since: v1.1.0
+        """
+
+        EncodedPayloadCache.get_instance().clear()
+
+        tracemalloc.start()
+        callback()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        iterations = 0
+        duration = 0
+
+        while (duration < self.min_duration):
+            EncodedPayloadCache.get_instance().clear()
+
+            started = perf_counter()
+            callback()
+            duration += perf_counter() - started
+
+            iterations += 1
+        #
+
+        self.results[name] = { "iterations": iterations,
+                               "operations_per_second": iterations / duration,
+                               "peak_memory": peak_memory,
+                               "throughput": size * iterations / duration / 1048576
+                             }
+    #
+
+    def _measure_import(self, name, module_name, repetitions = 5):
+        """
+Measures the cold start import time of the given module in new
+interpreter processes. The fastest of all repetitions is used.
+
+:param name: Scenario name
+:param module_name: Module to import
+:param repetitions: Number of interpreter processes started
+
+:since: v1.1.0
+        """
+
+        environment = environ.copy()
+        environment['PYTHONPATH'] = pathsep.join(sys.path)
+
+        import_time = None
+
+        for _ in range(0, repetitions):
+            output = subprocess.run([ sys.executable, "-X", "importtime", "-c", "import " + module_name ],
+                                    env = environment,
+                                    stderr = subprocess.PIPE,
+                                    check = True
+                                   ).stderr.decode("utf-8")
+
+            # Output lines are "import time: self [us] | cumulative | name"
+            for line in output.splitlines():
+                columns = line.split("|")
+
+                if (len(columns) == 3 and columns[2].strip() == module_name):
+                    cumulative_time = int(columns[1]) / 1000000
+                    if (import_time is None or cumulative_time < import_time): import_time = cumulative_time
+                #
+            #
+        #
+
+        self.results[name] = { "import_time": import_time }
+    #
+
+    def run(self):
+        """
+Runs all benchmark scenarios.
+
+:return: (dict) Benchmark results
+:since:  v1.1.0
+        """
+
+        self._measure_import("import_message", "dNG.data.rfc.email.message")
+
+        for size in self.sizes:
+            text = BenchmarkRfcEMail._get_text(size)
+            data = urandom(size)
+
+            self._measure("part_text_body_{0:d}".format(size),
+                          size,
+                          lambda: Part(Part.TYPE_MESSAGE_BODY, "text/plain", text)
+                         )
+
+            self._measure("part_binary_attachment_{0:d}".format(size),
+                          size,
+                          lambda: Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", data, file_name = "data.bin")
+                         )
+
+            self._measure("message_text_body_{0:d}".format(size),
+                          size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", text )))
+                         )
+
+            self._measure("message_alternative_{0:d}".format(size),
+                          2 * size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", text ),
+                                                                                           ( "text/html", text )
+                                                                                          ))
+                         )
+
+            # The "EmailMessage" backend is measured with the same messages
+            self._measure("message_alternative_email_message_{0:d}".format(size),
+                          2 * size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", text ),
+                                                                                           ( "text/html", text ),
+                                                                                           policy = SMTPUTF8
+                                                                                          ))
+                         )
+
+            frozen_body = BenchmarkRfcEMail._get_message(( "text/plain", text ), ( "text/html", text )).freeze_body()
+
+            self._measure("message_frozen_alternative_{0:d}".format(size),
+                          2 * size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(frozen_body = frozen_body))
+                         )
+
+            # Identical related parts are deduplicated so that each image
+            # needs data of its own.
+            images = [ data ] + [ urandom(size) for _ in range(0, 3) ]
+
+            self._measure("message_related_images_{0:d}".format(size),
+                          5 * size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/html", text ),
+                                                                                           related = images
+                                                                                          ))
+                         )
+
+            self._measure("message_large_attachment_{0:d}".format(size),
+                          size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", "Hello world" ),
+                                                                                           attachments = [ data ]
+                                                                                          ))
+                         )
+
+            self._measure("message_large_attachment_email_message_{0:d}".format(size),
+                          size,
+                          lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", "Hello world" ),
+                                                                                           attachments = [ data ],
+                                                                                           policy = SMTPUTF8
+                                                                                          ))
+                         )
+        #
+
+        attachments = [ urandom(16384) for _ in range(0, 50) ]
+
+        self._measure("message_many_attachments_50",
+                      50 * 16384,
+                      lambda: BenchmarkRfcEMail._render(BenchmarkRfcEMail._get_message(( "text/plain", "Hello world" ),
+                                                                                       attachments = attachments
+                                                                                      ))
+                     )
+
+        return self.results
+    #
+
+    @staticmethod
+    def _get_message(*bodies, **kwargs):
+        """
+Returns a message with the given bodies, related parts and attachments.
+
+:return: (object) Message instance
+:since:  v1.1.0
+        """
+
+        _return = Message()
+        _return.sender = "sender@localhost"
+        _return.subject = "Benchmark message öäü"
+        _return.add_to("recipient@localhost")
+
+        for mimetype, body in bodies: _return.add_body(Part(Part.TYPE_MESSAGE_BODY, mimetype, body))
+
+        for data in kwargs.get("related", [ ]):
+            _return.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", data, file_name = "image.png"))
+        #
+
+        for data in kwargs.get("attachments", [ ]):
+            _return.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", data, file_name = "data.bin"))
+        #
+
+        if ("frozen_body" in kwargs): _return.frozen_body = kwargs['frozen_body']
+        if ("policy" in kwargs): _return.policy = kwargs['policy']
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_text(size):
+        """
+Returns a mostly ASCII text of the given size.
+
+:param size: Text size in characters
+
+:return: (str) Text
+:since:  v1.1.0
+        """
+
+        line = "The quick brown fox jumps over the lazy dog. Schön öäü.\n"
+        return (line * (1 + size // len(line)))[:size]
+    #
+
+    @staticmethod
+    def _render(message):
+        """
+Renders the given message.
+
+:param message: Message instance
+
+:since: v1.1.0
+        """
+
+        for _ in message.iter_chunks(): pass
+    #
+#
+
+if (__name__ == "__main__"):
+    parser = ArgumentParser(description = "Benchmark part construction and message serialization")
+    parser.add_argument("--baseline", default = BenchmarkRfcEMail.DEFAULT_BASELINE_FILE_PATH_NAME, help = "Baseline file path and name")
+    parser.add_argument("--compare", action = "store_true", help = "Compare the results with the baseline")
+    parser.add_argument("--import-budget", type = float, default = BenchmarkRfcEMail.DEFAULT_IMPORT_TIME_BUDGET, help = "Maximum cold start import time in seconds")
+    parser.add_argument("--min-duration", type = float, default = 0.5, help = "Minimum measured duration per scenario in seconds")
+    parser.add_argument("--save-baseline", action = "store_true", help = "Store the results as baseline")
+    parser.add_argument("--sizes", type = int, nargs = "+", help = "Payload sizes in bytes")
+    parser.add_argument("--tolerance", type = float, default = 0.2, help = "Accepted relative deviation from the baseline")
+    args = parser.parse_args()
+
+    benchmark = BenchmarkRfcEMail(args.sizes, args.min_duration)
+    results = benchmark.run()
+
+    for name in sorted(results):
+        result = results[name]
+
+        if ("import_time" in result):
+            print("{0:<45} {1:>10.2f} ms import".format(name, 1000 * result['import_time']))
+            continue
+        #
+
+        print("{0:<45} {1:>10.2f} MiB/s {2:>12.1f} ops/s {3:>14d} bytes peak".format(name,
+                                                                                   result['throughput'],
+                                                                                   result['operations_per_second'],
+                                                                                   result['peak_memory']
+                                                                                  ))
+    #
+
+    exit_code = 0
+
+    budget_violations = benchmark.get_import_budget_violations(args.import_budget)
+
+    for budget_violation in budget_violations: print("BUDGET " + budget_violation)
+    if (len(budget_violations) > 0): exit_code = 1
+
+    if (args.compare):
+        with open(args.baseline, "r") as file_obj: baseline = json.load(file_obj)
+        regressions = benchmark.compare(baseline, args.tolerance)
+
+        for regression in regressions: print("REGRESSION " + regression)
+        if (len(regressions) > 0): exit_code = 1
+    #
+
+    if (args.save_baseline):
+        with open(args.baseline, "w") as file_obj: json.dump(results, file_obj, indent = 4, sort_keys = True)
+    #
+
+    sys.exit(exit_code)
+#
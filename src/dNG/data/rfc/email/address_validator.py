@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email.utils import parseaddr
+from functools import lru_cache
+import re
+
+try:
+    _PY_STR = unicode.encode
+    _PY_UNICODE_TYPE = unicode
+except NameError:
+    _PY_STR = bytes.decode
+    _PY_UNICODE_TYPE = str
+#
+
+class AddressValidator(object):
+    """
+The address validator checks common addr-spec addresses with a precompiled
+RegExp and falls back to "email.utils.parseaddr()" for all other ones.
+Results are kept in a bounded cache.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    CACHE_SIZE = 16384
+    """
+Maximum number of cached validation results
+    """
+    RE_ADDR_SPEC = re.compile("^[A-Za-z0-9!#$%&'*+/=?^_`{|}~.-]+@[A-Za-z0-9-]+(?:\\.[A-Za-z0-9-]+)*$")
+    """
+RegExp matching common addr-spec addresses
+    """
+
+    @staticmethod
+    def get_cache_info():
+        """
+Returns the statistics of the validation result cache.
+
+:return: (object) "functools" cache info
+:since:  v1.1.0
+        """
+
+        return AddressValidator._is_valid.cache_info()
+    #
+
+    @staticmethod
+    def is_valid(address):
+        """
+Returns true if the given address is valid.
+
+:param address: E-mail address
+
+:return: (bool) True if valid
+:since:  v1.1.0
+        """
+
+        return (AddressValidator.RE_ADDR_SPEC.match(address) is not None or AddressValidator._is_valid(address))
+    #
+
+    @staticmethod
+    @lru_cache(maxsize = CACHE_SIZE)
+    def _is_valid(address):
+        """
+Returns true if "email.utils.parseaddr()" finds an address.
+
+:param address: E-mail address
+
+:return: (bool) True if valid
+:since:  v1.1.0
+        """
+
+        # global: _PY_STR, _PY_UNICODE_TYPE
+
+        address_data = parseaddr(address)[1]
+        if (str is not _PY_UNICODE_TYPE and type(address_data) is _PY_UNICODE_TYPE): address_data = _PY_STR(address_data, "utf-8")
+
+        return (address_data != "")
+    #
+
+    @staticmethod
+    def validate(address):
+        """
+Validates the given address.
+
+:param address: E-mail address
+
+:since: v1.1.0
+        """
+
+        if (not AddressValidator.is_valid(address)): raise TypeError("Given e-mail is not valid")
+    #
+
+    @staticmethod
+    def validate_many(addresses):
+        """
+Validates all given addresses without raising an exception for invalid
+ones.
+
+:param addresses: Iterable of e-mail addresses
+
+:return: (dict) Dictionary of invalid addresses and the corresponding
+         exception; empty if all addresses are valid
+:since:  v1.1.0
+        """
+
+        _return = { }
+
+        for address in addresses:
+            if (not AddressValidator.is_valid(address)): _return[address] = TypeError("Given e-mail is not valid")
+        #
+
+        return _return
+    #
+#
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+import re
+
+class ContentIdAliasRewriter(object):
+    """
+The Content-ID alias rewriter replaces "cid:" references to Content-ID
+aliases of deduplicated parts in message bodies. Iterating over an instance
+reads the payload of the body part in blocks and yields it rewritten, so
+that bodies read from sources are never held in memory as a whole.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    def __init__(self, aliases, part = None):
+        """
+Constructor __init__(ContentIdAliasRewriter)
+
+:param aliases: Dictionary of Content-ID aliases and the Content-ID used
+                instead
+:param part: Message body part to be read on iteration
+
+:since: v1.1.0
+        """
+
+        self._content_id_references = dict(( alias.encode("utf-8"), "cid:{0}".format(aliases[alias]).encode("utf-8") )
+                                           for alias in aliases
+                                          )
+        """
+Dictionary of encoded aliases and the "cid:" reference used instead
+        """
+        self.part = part
+        """
+Message body part read on iteration
+        """
+
+        aliases = sorted(self._content_id_references, key = len, reverse = True)
+
+        # References must end with the Content-ID to not match longer ones
+        # starting with an alias.
+        alias_pattern = (b"|".join(re.escape(alias) for alias in aliases) if (len(aliases) > 0) else b"(?!)")
+        self._alias_re = re.compile(b"cid:(" + alias_pattern + b")(?=[\"'>)\\s]|\\Z)")
+        """
+RegExp matching "cid:" references to aliases
+        """
+        self._max_reference_size = (4 + max(len(alias) for alias in aliases) if (len(aliases) > 0) else 0)
+        """
+Maximum size of a "cid:" reference to an alias
+        """
+    #
+
+    def __iter__(self):
+        """
+python.org: Return an iterator object.
+
+:return: (object) Generator yielding the rewritten payload
+:since:  v1.1.0
+        """
+
+        return self.iter_rewritten(self.part.iter_payload())
+    #
+
+    def _get_content_id_reference(self, result):
+        """
+Returns the "cid:" reference replacing the matched one.
+
+:param result: RegExp match object
+
+:return: (bytes) "cid:" reference
+:since:  v1.1.0
+        """
+
+        return self._content_id_references[result.group(1)]
+    #
+
+    def iter_rewritten(self, chunks):
+        """
+Yields the given chunks with "cid:" references rewritten. The end of each
+chunk that may contain the start of a reference is held back until the
+next chunk is available.
+
+:param chunks: Iterable of bytes
+
+:since: v1.1.0
+        """
+
+        # A complete reference and the delimiter following it must be
+        # available to rewrite it
+        held_size = 1 + self._max_reference_size
+        remainder = b""
+
+        for chunk in chunks:
+            data = remainder + chunk
+            size = max(0, len(data) - held_size)
+            position = 0
+            rewritten_data = [ ]
+
+            for result in self._alias_re.finditer(data):
+                if (result.start() >= size): break
+
+                rewritten_data.append(data[position:result.start()])
+                rewritten_data.append(self._get_content_id_reference(result))
+
+                position = result.end()
+            #
+
+            size = max(size, position)
+            rewritten_data.append(data[position:size])
+
+            remainder = data[size:]
+
+            data = b"".join(rewritten_data)
+            if (data): yield data
+        #
+
+        if (remainder): yield self.rewrite(remainder)[0]
+    #
+
+    def rewrite(self, data):
+        """
+Returns the given data with "cid:" references rewritten.
+
+:param data: Data to be rewritten
+
+:return: (tuple) Rewritten data and the number of references rewritten
+:since:  v1.1.0
+        """
+
+        return self._alias_re.subn(self._get_content_id_reference, data)
+    #
+#
@@ -0,0 +1,544 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from hashlib import sha256
+from threading import RLock
+import re
+
+from .serializer import Serializer
+
+class DkimSigner(object):
+    """
+The DKIM signer adds RFC 6376 "DKIM-Signature" headers using "rsa-sha256"
+and the "relaxed/relaxed" canonicalization. Body hashes of frozen bodies
+shared by several messages are calculated only once and cached, so that
+only the header set of each message is canonicalized and signed.
+Signatures are created by the "cryptography" package if it is installed.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    CACHE_SIZE = 256
+    """
+Maximum number of cached body hashes
+    """
+    DEFAULT_HEADER_NAMES = ( "from", "reply-to", "subject", "date", "to", "cc",
+                             "message-id", "mime-version", "content-type", "content-transfer-encoding"
+                           )
+    """
+Names of headers signed if present
+    """
+    RE_WSP = re.compile(b"[ \\t]+")
+    """
+RegExp matching sequences of whitespace
+    """
+    SHA256_DIGEST_INFO = bytes.fromhex("3031300d060960864801650304020105000420")
+    """
+DER encoded "DigestInfo" prefix of SHA-256 digests (RFC 8017, section 9.2)
+    """
+
+    def __init__(self, domain, selector, private_key, header_names = None):
+        """
+Constructor __init__(DkimSigner)
+
+:param domain: Signing domain ("d=" tag)
+:param selector: Selector of the public key DNS record ("s=" tag)
+:param private_key: PEM encoded RSA private key in PKCS #1 or PKCS #8
+                    format
+:param header_names: Names of headers to be signed if present
+
+:since: v1.1.0
+        """
+
+        self._body_hashes = OrderedDict()
+        """
+Cached body hashes in least recently used order
+        """
+        self._cryptography_private_key = None
+        """
+"cryptography" RSA private key instance if the package is installed
+        """
+        self.domain = domain
+        """
+Signing domain
+        """
+        self.header_names = (DkimSigner.DEFAULT_HEADER_NAMES if (header_names is None) else tuple(name.lower() for name in header_names))
+        """
+Names of headers signed if present
+        """
+        self._hits = 0
+        """
+Number of body hash cache hits
+        """
+        self._lock = RLock()
+        """
+Thread safety lock
+        """
+        self._misses = 0
+        """
+Number of body hash cache misses
+        """
+        self._private_key = DkimSigner._load_private_key(private_key)
+        """
+RSA private key numbers
+        """
+        self.selector = selector
+        """
+Selector of the public key DNS record
+        """
+
+        self._cryptography_private_key = DkimSigner._get_cryptography_private_key(self._private_key)
+    #
+
+    def __getstate__(self):
+        """
+python.org: Called to return the state of the instance to be pickled.
+
+:return: (dict) Instance state
+:since:  v1.1.0
+        """
+
+        _return = self.__dict__.copy()
+
+        _return['_body_hashes'] = OrderedDict()
+        _return['_cryptography_private_key'] = None
+        del(_return['_lock'])
+
+        return _return
+    #
+
+    def __setstate__(self, state):
+        """
+python.org: Called to restore the state of the unpickled instance.
+
+:param state: Instance state
+
+:since: v1.1.0
+        """
+
+        self.__dict__.update(state)
+
+        self._cryptography_private_key = DkimSigner._get_cryptography_private_key(self._private_key)
+        self._lock = RLock()
+    #
+
+    @property
+    def public_key(self):
+        """
+Returns the RSA public key numbers.
+
+:return: (tuple) Modulus and public exponent
+:since:  v1.1.0
+        """
+
+        return self._private_key[:2]
+    #
+
+    @property
+    def statistics(self):
+        """
+Returns the body hash cache statistics.
+
+:return: (dict) Dictionary with "hits", "misses" and "entries"
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            return { "hits": self._hits,
+                     "misses": self._misses,
+                     "entries": len(self._body_hashes)
+                   }
+        #
+    #
+
+    def get_body_hash(self, part):
+        """
+Returns the base64 encoded SHA-256 hash of the relaxed canonicalized body
+of the given populated message part. The hash is cached for frozen bodies.
+Parts read from sources that can only be read once are not supported.
+
+:param part: Populated message part
+
+:return: (str) Body hash
+:since:  v1.1.0
+        """
+
+        frozen_bodies = getattr(part, "frozen_bodies", None)
+        _return = None
+
+        # Copies of a frozen part share the dictionary of serialized bodies.
+        # It is kept referenced to ensure that its ID is not reused.
+        if (frozen_bodies is not None):
+            with self._lock:
+                entry = self._body_hashes.get(id(frozen_bodies))
+
+                if (entry is None): self._misses += 1
+                else:
+                    self._body_hashes.move_to_end(id(frozen_bodies))
+                    self._hits += 1
+
+                    _return = entry[1]
+                #
+            #
+        #
+
+        if (_return is None):
+            # The body is hashed before it is sent and would therefore be
+            # read twice.
+            for sub_part in part.walk():
+                if (getattr(sub_part, "is_single_use_source", False)):
+                    raise ValueError("Parts read from sources that can only be read once can not be signed")
+                #
+            #
+
+            body_hash = sha256()
+
+            for data in DkimSigner.iter_relaxed_body(Serializer("\r\n").iter_body_chunks(part)):
+                body_hash.update(data)
+            #
+
+            _return = b64encode(body_hash.digest()).decode("ascii")
+
+            if (frozen_bodies is not None):
+                with self._lock:
+                    self._body_hashes[id(frozen_bodies)] = ( frozen_bodies, _return )
+                    while (len(self._body_hashes) > DkimSigner.CACHE_SIZE): self._body_hashes.popitem(False)
+                #
+            #
+        #
+
+        return _return
+    #
+
+    def get_signature(self, part):
+        """
+Returns the "DKIM-Signature" header value for the given populated message
+part.
+
+:param part: Populated message part
+
+:return: (str) Header value
+:since:  v1.1.0
+        """
+
+        header_fields = DkimSigner._get_header_fields(Serializer("\r\n").get_header_chunk(part))
+        signed_header_data = [ ]
+        signed_header_names = [ ]
+
+        # Header fields of the same name are signed from the bottom up
+        for name in self.header_names:
+            for header_field in reversed(header_fields.get(name, [ ])):
+                signed_header_data.append(DkimSigner.get_relaxed_header(header_field))
+                signed_header_names.append(name)
+            #
+        #
+
+        _return = "v=1; a=rsa-sha256; c=relaxed/relaxed; d={0}; s={1};\n\th={2};\n\tbh={3};\n\tb=".format(self.domain,
+                                                                                                         self.selector,
+                                                                                                         ":".join(signed_header_names),
+                                                                                                         self.get_body_hash(part)
+                                                                                                        )
+
+        signed_header_data.append(DkimSigner.get_relaxed_header(b"DKIM-Signature: " + _return.encode("ascii"))[:-2])
+        signature = b64encode(self._sign(b"".join(signed_header_data))).decode("ascii")
+
+        _return += "\n\t".join(signature[position:position + 64] for position in range(0, len(signature), 64))
+
+        return _return
+    #
+
+    def _sign(self, data):
+        """
+Returns the RSASSA-PKCS1-v1_5 signature of the SHA-256 hash of the given
+data (RFC 8017, section 8.2). The "cryptography" package is used if it is
+installed.
+
+:param data: Data to be signed
+
+:return: (bytes) Signature
+:since:  v1.1.0
+        """
+
+        if (self._cryptography_private_key is not None):
+            from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+            from cryptography.hazmat.primitives.hashes import SHA256
+
+            _return = self._cryptography_private_key.sign(data, PKCS1v15(), SHA256())
+        else:
+            size = (self._private_key[0].bit_length() + 7) // 8
+
+            digest_info = DkimSigner.SHA256_DIGEST_INFO + sha256(data).digest()
+            if (size < len(digest_info) + 11): raise ValueError("Given RSA key is too short")
+
+            encoded_message = b"\x00\x01" + (b"\xff" * (size - len(digest_info) - 3)) + b"\x00" + digest_info
+
+            signature = DkimSigner._get_rsa_signature(self._private_key, int.from_bytes(encoded_message, "big"))
+            _return = signature.to_bytes(size, "big")
+        #
+
+        return _return
+    #
+
+    def sign(self, part):
+        """
+Adds the "DKIM-Signature" header to the given populated message part. The
+part must not be modified afterwards.
+
+:param part: Populated message part
+
+:since: v1.1.0
+        """
+
+        part['DKIM-Signature'] = self.get_signature(part)
+    #
+
+    @staticmethod
+    def _get_cryptography_private_key(private_key):
+        """
+Returns the "cryptography" RSA private key instance for the given key
+numbers.
+
+:param private_key: RSA private key numbers
+
+:return: (object) RSA private key instance; None if "cryptography" is not
+         installed
+:since:  v1.1.0
+        """
+
+        try:
+            from cryptography.hazmat.backends import default_backend
+            from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateNumbers, RSAPublicNumbers
+        except ImportError: return None
+
+        modulus, public_exponent, private_exponent, prime1, prime2, exponent1, exponent2, coefficient = private_key
+
+        return RSAPrivateNumbers(prime1,
+                                 prime2,
+                                 private_exponent,
+                                 exponent1,
+                                 exponent2,
+                                 coefficient,
+                                 RSAPublicNumbers(public_exponent, modulus)
+                                ).private_key(default_backend())
+    #
+
+    @staticmethod
+    def _get_der_value(data, position, tag):
+        """
+Returns the value of the DER encoded element of the given tag at the given
+position.
+
+:param data: DER encoded data
+:param position: Element position
+:param tag: Expected element tag
+
+:return: (tuple) Value and the position of the next element
+:since:  v1.1.0
+        """
+
+        if (position + 2 > len(data) or data[position] != tag): raise ValueError("Given RSA key is invalid")
+
+        size = data[position + 1]
+        position += 2
+
+        if (size > 127):
+            length_size = size & 127
+
+            size = int.from_bytes(data[position:position + length_size], "big")
+            position += length_size
+        #
+
+        if (position + size > len(data)): raise ValueError("Given RSA key is invalid")
+
+        return data[position:position + size], position + size
+    #
+
+    @staticmethod
+    def _get_header_fields(header_data):
+        """
+Returns the raw header fields of the given encoded header block.
+
+:param header_data: Header block with CRLF line separators
+
+:return: (dict) Dictionary of lowercase header names and lists of raw
+         header fields in the order given
+:since:  v1.1.0
+        """
+
+        _return = { }
+
+        for header_field in re.split(b"\r\n(?![ \t])", header_data.rstrip(b"\r\n")):
+            name = header_field.split(b":", 1)[0].strip().lower().decode("ascii", "replace")
+
+            if (name not in _return): _return[name] = [ ]
+            _return[name].append(header_field)
+        #
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_rsa_signature(private_key, message):
+        """
+Returns the RSA signature of the given encoded message. The message is
+blinded with a random factor and the signature is verified before it is
+returned, so that faulty results do not reveal the private key.
+
+:param private_key: RSA private key numbers
+:param message: Encoded message as integer
+
+:return: (int) Signature
+:since:  v1.1.0
+        """
+
+        from secrets import randbelow
+
+        modulus, public_exponent, _, prime1, prime2, exponent1, exponent2, coefficient = private_key
+
+        while True:
+            blinding_factor = 2 + randbelow(modulus - 3)
+
+            try:
+                unblinding_factor = pow(blinding_factor, -1, modulus)
+                break
+            except ValueError: pass
+        #
+
+        blinded_message = (message * pow(blinding_factor, public_exponent, modulus)) % modulus
+
+        # Chinese remainder theorem (RFC 8017, section 5.1.2)
+        signature1 = pow(blinded_message, exponent1, prime1)
+        signature2 = pow(blinded_message, exponent2, prime2)
+        signature = signature2 + prime2 * ((coefficient * (signature1 - signature2)) % prime1)
+
+        _return = (signature * unblinding_factor) % modulus
+        if (pow(_return, public_exponent, modulus) != message): raise ValueError("RSA signature verification failed")
+
+        return _return
+    #
+
+    @staticmethod
+    def get_relaxed_header(header_field):
+        """
+Returns the given raw header field canonicalized with the "relaxed"
+algorithm (RFC 6376, section 3.4.2).
+
+:param header_field: Raw header field
+
+:return: (bytes) Canonicalized header field with CRLF
+:since:  v1.1.0
+        """
+
+        name, value = header_field.split(b":", 1)
+
+        value = re.sub(b"\r?\n", b"", value)
+        value = DkimSigner.RE_WSP.sub(b" ", value).strip(b" ")
+
+        return name.strip().lower() + b":" + value + b"\r\n"
+    #
+
+    @staticmethod
+    def iter_relaxed_body(chunks):
+        """
+Yields the given body chunks canonicalized with the "relaxed" algorithm
+(RFC 6376, section 3.4.4). Trailing empty lines are held back until
+further content follows.
+
+:param chunks: Iterable of body chunks with CRLF line separators
+
+:since: v1.1.0
+        """
+
+        buffered_data = b""
+        empty_lines = 0
+
+        for chunk in chunks:
+            buffered_data += chunk
+            position = buffered_data.rfind(b"\r\n") + 2
+
+            if (position < 2): continue
+
+            data = DkimSigner.RE_WSP.sub(b" ", buffered_data[:position]).replace(b" \r\n", b"\r\n")
+            buffered_data = buffered_data[position:]
+
+            trailing_empty_lines = 0
+            while (data.endswith(b"\r\n", 0, len(data) - 2 * trailing_empty_lines)): trailing_empty_lines += 1
+
+            if (2 * trailing_empty_lines == len(data)): empty_lines += trailing_empty_lines
+            else:
+                # The first trailing CRLF terminates the last non-empty line
+                yield (b"\r\n" * empty_lines) + data[:len(data) + 2 - 2 * trailing_empty_lines]
+                empty_lines = trailing_empty_lines - 1
+            #
+        #
+
+        data = DkimSigner.RE_WSP.sub(b" ", buffered_data).rstrip(b" ")
+        if (len(data) > 0): yield (b"\r\n" * empty_lines) + data + b"\r\n"
+    #
+
+    @staticmethod
+    def _load_private_key(private_key):
+        """
+Returns the numbers of the given PEM encoded RSA private key.
+
+:param private_key: PEM encoded RSA private key in PKCS #1 or PKCS #8
+                    format
+
+:return: (tuple) Modulus, public exponent, private exponent, primes,
+         exponents and coefficient
+:since:  v1.1.0
+        """
+
+        if (isinstance(private_key, bytes)): private_key = private_key.decode("ascii")
+
+        pem_data = re.match("\\s*-----BEGIN (RSA )?PRIVATE KEY-----\\s*([A-Za-z0-9+/=\\s]+)-----END (RSA )?PRIVATE KEY-----\\s*$", private_key)
+        if (pem_data is None): raise ValueError("Given private key is not a PEM encoded RSA one")
+
+        data = b64decode(re.sub("\\s+", "", pem_data.group(2)))
+
+        if (pem_data.group(1) is None):
+            # PKCS #8 "PrivateKeyInfo" wraps the PKCS #1 "RSAPrivateKey"
+            data = DkimSigner._get_der_value(data, 0, 0x30)[0]
+            position = DkimSigner._get_der_value(data, 0, 0x02)[1]
+            algorithm, position = DkimSigner._get_der_value(data, position, 0x30)
+
+            if (b"\x2a\x86\x48\x86\xf7\x0d\x01\x01\x01" not in algorithm): raise ValueError("Given private key is not a RSA one")
+            data = DkimSigner._get_der_value(data, position, 0x04)[0]
+        #
+
+        data = DkimSigner._get_der_value(data, 0, 0x30)[0]
+        position = DkimSigner._get_der_value(data, 0, 0x02)[1]
+
+        _return = [ ]
+
+        for _ in range(0, 8):
+            value, position = DkimSigner._get_der_value(data, position, 0x02)
+            _return.append(int.from_bytes(value, "big"))
+        #
+
+        return tuple(_return)
+    #
+#
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email.generator import BytesGenerator
+from email.message import EmailMessage
+from email.policy import EmailPolicy, SMTP
+from io import BytesIO
+import re
+
+from .part import Part
+
+class EmailMessageBackend(object):
+    """
+The "EmailMessage" backend converts a populated MIME part tree to
+"email.message.EmailMessage" instances and formats them with the generator
+of the given "email.policy" policy. Policies with "utf8" enabled (e.g.
+"email.policy.SMTPUTF8") keep non-ASCII header values unencoded and text
+parts are sent as "8bit" if possible.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    CONTENT_HEADER_NAMES = ( "content-disposition", "content-id", "content-transfer-encoding", "content-type", "mime-version" )
+    """
+Names of headers set by the content manager of the policy for non-multipart
+parts
+    """
+    RE_LINE_ENDING = re.compile("\\r?\\n")
+    """
+RegExp to unfold header values
+    """
+
+    def __init__(self, policy = None):
+        """
+Constructor __init__(EmailMessageBackend)
+
+:param policy: "email.policy.EmailPolicy" instance (defaults to
+               "email.policy.SMTP")
+
+:since: v1.1.0
+        """
+
+        if (policy is None): policy = SMTP
+        elif (not isinstance(policy, EmailPolicy)): raise TypeError("Only email.policy.EmailPolicy instances are supported")
+
+        self.policy = policy
+        """
+Policy used to build and format messages
+        """
+    #
+
+    def as_bytes(self, part, linesep = "\n"):
+        """
+Returns the given populated message part formatted as bytes.
+
+:param part: Populated message part
+:param linesep: Line separator to be used
+
+:return: (bytes) Formatted message
+:since:  v1.1.0
+        """
+
+        file_obj = BytesIO()
+        BytesGenerator(file_obj, policy = self.policy.clone(linesep = linesep)).flatten(self.get_email_message(part))
+
+        return file_obj.getvalue()
+    #
+
+    def get_email_message(self, part):
+        """
+Returns the given populated message part and all of its sub parts as
+"email.message.EmailMessage" instances.
+
+:param part: Populated message part
+
+:return: (object) EmailMessage instance
+:since:  v1.1.0
+        """
+
+        return self._get_email_message(part, True)
+    #
+
+    def _get_email_message(self, part, is_root):
+        """
+Returns the given part and all of its sub parts as
+"email.message.EmailMessage" instances. Text parts not matching their
+charset are converted as binary ones.
+
+:param part: Message part
+:param is_root: True for the root part of the message
+
+:return: (object) EmailMessage instance
+:since:  v1.1.0
+        """
+
+        _return = EmailMessage(policy = self.policy)
+        is_multipart = part.is_multipart()
+
+        if (is_multipart):
+            for sub_part in part.get_payload(): _return.attach(self._get_email_message(sub_part, False))
+        else:
+            data = part.get_payload(decode = True)
+            content_arguments = { "disposition": part.get_content_disposition(),
+                                  "filename": part.get_filename(),
+                                  "cid": part.get("Content-ID")
+                                }
+
+            text = None
+
+            if (getattr(part, "type", None) in ( Part.TYPE_ATTACHMENT, Part.TYPE_INLINE, Part.TYPE_MESSAGE_BODY )):
+                # Text parts may contain data not matching their charset
+                try: text = data.decode(part.get_content_charset("utf-8"))
+                except ( LookupError, UnicodeDecodeError ): pass
+            #
+
+            if (text is None): _return.set_content(data, part.get_content_maintype(), part.get_content_subtype(), **content_arguments)
+            else: _return.set_content(text, part.get_content_subtype(), charset = "utf-8", **content_arguments)
+        #
+
+        for name, value in part.raw_items():
+            if (is_multipart or name.lower() not in EmailMessageBackend.CONTENT_HEADER_NAMES):
+                _return[name] = EmailMessageBackend.RE_LINE_ENDING.sub("", str(value))
+            #
+        #
+
+        # Only the message itself carries "MIME-Version" while "set_content()"
+        # adds it to each part
+        if (not is_root): del(_return['MIME-Version'])
+
+        return _return
+    #
+#
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from collections import OrderedDict
+from threading import RLock
+
+class EncodedPayloadCache(object):
+    """
+The encoded payload cache stores transfer encoded payloads identified by
+the hash of the raw data and the transfer encoding. Identical payloads are
+therefore only encoded once per process. Least recently used entries are
+removed if the configured size is exceeded.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    DEFAULT_MAX_SIZE = 67108864
+    """
+Default maximum size of all cached encoded payloads (64 MiB)
+    """
+
+    _instance = None
+    """
+Process wide cache instance
+    """
+    _instance_lock = RLock()
+    """
+Thread safety lock for the process wide cache instance
+    """
+
+    def __init__(self, max_size = None):
+        """
+Constructor __init__(EncodedPayloadCache)
+
+:param max_size: Maximum size of all cached encoded payloads in bytes
+
+:since: v1.1.0
+        """
+
+        self._entries = OrderedDict()
+        """
+Cached encoded payloads in least recently used order
+        """
+        self._evictions = 0
+        """
+Number of entries removed to stay within the maximum size
+        """
+        self._hits = 0
+        """
+Number of cache hits
+        """
+        self._lock = RLock()
+        """
+Thread safety lock
+        """
+        self._max_size = (EncodedPayloadCache.DEFAULT_MAX_SIZE if (max_size is None) else max_size)
+        """
+Maximum size of all cached encoded payloads in bytes
+        """
+        self._misses = 0
+        """
+Number of cache misses
+        """
+        self._size = 0
+        """
+Size of all cached encoded payloads in bytes
+        """
+    #
+
+    def __len__(self):
+        """
+python.org: Called to implement the built-in function len().
+
+:return: (int) Number of cached entries
+:since:  v1.1.0
+        """
+
+        return len(self._entries)
+    #
+
+    @property
+    def max_size(self):
+        """
+Returns the maximum size of all cached encoded payloads.
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        return self._max_size
+    #
+
+    @max_size.setter
+    def max_size(self, max_size):
+        """
+Sets the maximum size of all cached encoded payloads. A size of 0 disables
+the cache.
+
+:param max_size: Size in bytes
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._max_size = max_size
+            self._remove_exceeding_entries()
+        #
+    #
+
+    @property
+    def size(self):
+        """
+Returns the size of all cached encoded payloads.
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        return self._size
+    #
+
+    @property
+    def statistics(self):
+        """
+Returns the cache statistics.
+
+:return: (dict) Dictionary with "hits", "misses", "evictions", "entries"
+         and "size"
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            return { "hits": self._hits,
+                     "misses": self._misses,
+                     "evictions": self._evictions,
+                     "entries": len(self._entries),
+                     "size": self._size
+                   }
+        #
+    #
+
+    def clear(self):
+        """
+Removes all cached entries and resets the statistics.
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+            self._evictions = 0
+            self._hits = 0
+            self._misses = 0
+            self._size = 0
+        #
+    #
+
+    def get_encoded(self, data, transfer_encoding, encoder):
+        """
+Returns the encoded payload for the given data. The encoder is only called
+if no cached entry exists.
+
+:param data: Raw data
+:param transfer_encoding: Content-Transfer-Encoding name
+:param encoder: Callable returning the encoded payload for the raw data
+
+:return: (mixed) Encoded payload
+:since:  v1.1.0
+        """
+
+        if (self._max_size < 1): return encoder(data)
+
+        from hashlib import sha256
+        key = ( sha256(data).digest(), transfer_encoding )
+
+        with self._lock:
+            _return = self._entries.get(key)
+
+            if (_return is None): self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            #
+        #
+
+        if (_return is None):
+            _return = encoder(data)
+            size = len(_return)
+
+            if (size <= self._max_size):
+                with self._lock:
+                    if (key not in self._entries):
+                        self._entries[key] = _return
+                        self._size += size
+
+                        self._remove_exceeding_entries()
+                    #
+                #
+            #
+        #
+
+        return _return
+    #
+
+    def _remove_exceeding_entries(self):
+        """
+Removes least recently used entries until the size of all cached encoded
+payloads is within the configured maximum size.
+
+:since: v1.1.0
+        """
+
+        while (self._size > self._max_size and len(self._entries) > 0):
+            _, encoded_data = self._entries.popitem(last = False)
+
+            self._evictions += 1
+            self._size -= len(encoded_data)
+        #
+    #
+
+    @staticmethod
+    def get_instance():
+        """
+Returns the process wide cache instance.
+
+:return: (object) EncodedPayloadCache instance
+:since:  v1.1.0
+        """
+
+        if (EncodedPayloadCache._instance is None):
+            with EncodedPayloadCache._instance_lock:
+                if (EncodedPayloadCache._instance is None): EncodedPayloadCache._instance = EncodedPayloadCache()
+            #
+        #
+
+        return EncodedPayloadCache._instance
+    #
+#
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from binascii import b2a_base64
+from quopri import encodestring
+import re
+
+class Encoder(object):
+    """
+The encoder implements the base64 and quoted-printable Content-Transfer-
+Encodings for data given in blocks of arbitrary size. Data is processed in
+fixed-size chunks through "memoryview" slices and encoded lines are limited
+to 76 characters.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    BASE64_CHUNK_SIZE = 57 * 1024
+    """
+Size of chunks encoded at once (multiple of 57 bytes to result in complete
+base64 lines)
+    """
+    BASE64_LINE_SIZE = 57
+    """
+Number of bytes encoded to a base64 line of 76 characters
+    """
+    LINE_LENGTH = 76
+    """
+Maximum length of encoded lines
+    """
+    QUOTED_PRINTABLE_CHUNK_SIZE = 64 * 1024
+    """
+Size of chunks encoded at once
+    """
+    RE_QUOTED_PRINTABLE_LONG_LINE = re.compile(b"[^\n]{77,}")
+    """
+RegExp matching quoted-printable lines exceeding 76 characters
+    """
+
+    @staticmethod
+    def encode(data, transfer_encoding):
+        """
+Returns the given data encoded with the Content-Transfer-Encoding given.
+"7bit" and "8bit" data is returned unchanged.
+
+:param data: Raw data
+:param transfer_encoding: Content-Transfer-Encoding name
+
+:return: (bytes) Encoded data
+:since:  v1.1.0
+        """
+
+        return (bytes(data)
+                if (transfer_encoding == "7bit" or transfer_encoding == "8bit") else
+                b"".join(Encoder.iter_encoded(( data, ), transfer_encoding))
+               )
+    #
+
+    @staticmethod
+    def encode_base64(data):
+        """
+Returns the given data base64 encoded in lines of 76 characters.
+
+:param data: Raw data
+
+:return: (bytes) Encoded data
+:since:  v1.1.0
+        """
+
+        return b"".join(Encoder.iter_base64(( data, )))
+    #
+
+    @staticmethod
+    def encode_quoted_printable(data):
+        """
+Returns the given data quoted-printable encoded.
+
+:param data: Raw data
+
+:return: (bytes) Encoded data
+:since:  v1.1.0
+        """
+
+        return b"".join(Encoder.iter_quoted_printable(( data, )))
+    #
+
+    @staticmethod
+    def iter_base64(blocks):
+        """
+Yields the base64 encoded data of the given blocks. Encoded lines have 76
+characters, are separated by "\\n" and the last one is not terminated.
+
+:param blocks: Iterable of raw data blocks of any size
+
+:since: v1.1.0
+        """
+
+        line_length = Encoder.LINE_LENGTH
+        line_stride = 1 + line_length
+
+        max_lines = 1 + Encoder.BASE64_CHUNK_SIZE // Encoder.BASE64_LINE_SIZE
+
+        buffer = bytearray(1 + max_lines * line_stride)
+        buffer_view = memoryview(buffer)
+        line_endings = b"\n" * max_lines
+        offset = 0
+
+        for chunk in Encoder._iter_chunks(blocks, Encoder.BASE64_CHUNK_SIZE, Encoder.BASE64_LINE_SIZE):
+            encoded_data = b2a_base64(chunk, newline = False)
+            encoded_size = len(encoded_data)
+
+            lines = encoded_size // line_length
+            lines_size = lines * line_length
+            size = offset + lines * line_stride
+
+            # Complete lines are copied column by column with extended slices
+            # instead of line by line.
+            if (lines > 0):
+                for column in range(0, line_length):
+                    buffer[offset + column:size:line_stride] = encoded_data[column:lines_size:line_length]
+                #
+
+                buffer[offset + line_length:size:line_stride] = line_endings[:lines]
+            #
+
+            if (lines_size < encoded_size):
+                buffer_view[size:size + encoded_size - lines_size] = encoded_data[lines_size:]
+                size += encoded_size - lines_size
+            else: size -= 1
+
+            yield bytes(buffer_view[:size])
+
+            buffer[0] = 10
+            offset = 1
+        #
+    #
+
+    @staticmethod
+    def iter_encoded(blocks, transfer_encoding):
+        """
+Returns a generator yielding the data of the given blocks encoded with the
+Content-Transfer-Encoding given.
+
+:param blocks: Iterable of raw data blocks of any size
+:param transfer_encoding: Content-Transfer-Encoding name
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        if (transfer_encoding == "base64"): _return = Encoder.iter_base64(blocks)
+        elif (transfer_encoding == "quoted-printable"): _return = Encoder.iter_quoted_printable(blocks)
+        elif (transfer_encoding == "7bit" or transfer_encoding == "8bit"): _return = ( bytes(block) for block in blocks )
+        else: raise ValueError("Given Content-Transfer-Encoding is not supported")
+
+        return _return
+    #
+
+    @staticmethod
+    def iter_quoted_printable(blocks):
+        """
+Yields the quoted-printable encoded data of the given blocks. Chunks are
+split at line endings to be encoded identically to the complete data.
+
+:param blocks: Iterable of raw data blocks of any size
+
+:since: v1.1.0
+        """
+
+        buffered_data = b""
+
+        for chunk in Encoder._iter_chunks(blocks, Encoder.QUOTED_PRINTABLE_CHUNK_SIZE):
+            buffered_data += chunk
+            position = buffered_data.rfind(b"\n") + 1
+
+            if (position > 0):
+                yield Encoder._get_limited_quoted_printable(encodestring(buffered_data[:position]))
+                buffered_data = buffered_data[position:]
+            elif (len(buffered_data) >= Encoder.QUOTED_PRINTABLE_CHUNK_SIZE):
+                yield Encoder._get_quoted_printable_soft_break(encodestring(buffered_data))
+                buffered_data = b""
+            #
+        #
+
+        if (len(buffered_data) > 0): yield Encoder._get_limited_quoted_printable(encodestring(buffered_data))
+    #
+
+    @staticmethod
+    def _get_limited_quoted_printable(encoded_data):
+        """
+Returns the given quoted-printable encoded data with all lines limited to
+76 characters. "quopri" exceeds the limit for long lines ending with
+encoded whitespace.
+
+:param encoded_data: Quoted-printable encoded data
+
+:return: (bytes) Encoded data
+:since:  v1.1.0
+        """
+
+        return Encoder.RE_QUOTED_PRINTABLE_LONG_LINE.sub(lambda result: Encoder._get_quoted_printable_lines(result.group(0)),
+                                                         encoded_data
+                                                        )
+    #
+
+    @staticmethod
+    def _get_quoted_printable_lines(line):
+        """
+Returns the given quoted-printable encoded line split with soft line
+breaks into lines of at most 76 characters. Encoded characters are never
+split.
+
+:param line: Quoted-printable encoded line without line ending
+
+:return: (bytes) Encoded lines
+:since:  v1.1.0
+        """
+
+        # A soft line break ending the line must be kept as its last
+        # character
+        is_soft_break = (line[-1:] == b"=")
+        if (is_soft_break): line = line[:-1]
+
+        max_length = (75 if (is_soft_break) else 76)
+        lines = [ ]
+
+        while (len(line) > max_length):
+            position = 75
+
+            if (line[position - 1:position] == b"="): position -= 1
+            elif (line[position - 2:position - 1] == b"="): position -= 2
+
+            lines.append(line[:position] + b"=\n")
+            line = line[position:]
+        #
+
+        lines.append(line + b"=" if (is_soft_break) else line)
+        return b"".join(lines)
+    #
+
+    @staticmethod
+    def _get_quoted_printable_soft_break(encoded_data):
+        """
+Returns the given quoted-printable encoded data ending with a soft line
+break. All lines are limited to 76 characters.
+
+:param encoded_data: Quoted-printable encoded data
+
+:return: (bytes) Encoded data ending with a soft line break
+:since:  v1.1.0
+        """
+
+        position = encoded_data.rfind(b"\n") + 1
+
+        return (Encoder._get_limited_quoted_printable(encoded_data[:position])
+                + Encoder._get_quoted_printable_lines(encoded_data[position:] + b"=")
+                + b"\n"
+               )
+    #
+
+    @staticmethod
+    def _iter_chunks(blocks, chunk_size, alignment = 1):
+        """
+Yields "memoryview" chunks of at most the given size for the given blocks.
+All chunks but the last one are a multiple of the alignment given.
+
+:param blocks: Iterable of raw data blocks of any size
+:param chunk_size: Maximum chunk size (multiple of the alignment)
+:param alignment: Chunk size alignment
+
+:since: v1.1.0
+        """
+
+        remainder = b""
+
+        for block in blocks:
+            view = memoryview(block)
+
+            if (len(remainder) > 0):
+                position = alignment - len(remainder)
+
+                remainder += view[:position]
+                view = view[position:]
+
+                if (len(remainder) < alignment): continue
+
+                yield memoryview(remainder)
+                remainder = b""
+            #
+
+            aligned_size = len(view) - (len(view) % alignment)
+
+            for position in range(0, aligned_size, chunk_size):
+                yield view[position:min(position + chunk_size, aligned_size)]
+            #
+
+            if (aligned_size < len(view)): remainder = view[aligned_size:].tobytes()
+        #
+
+        if (len(remainder) > 0): yield memoryview(remainder)
+    #
+#
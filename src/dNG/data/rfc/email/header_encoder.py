@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email.header import Header
+from email.utils import formataddr, getaddresses
+from functools import lru_cache
+import re
+
+class HeaderEncoder(object):
+    """
+The header encoder provides RFC 2047 encoding and folding of header values.
+Encoded results are kept in bounded memo caches as the same subjects and
+display names are used for a large number of messages.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    CACHE_SIZE = 4096
+    """
+Maximum number of memorized results per cache
+    """
+    RE_NON_ASCII = re.compile("[^\\x20-\\x7e\\t]")
+    """
+RegExp to find characters requiring RFC 2047 encoding in header values
+    """
+    RE_SUBJECT_SPECIAL = re.compile("[\\x00-\\x19\\x22\\x28\\x29\\x2c\\x2e\\x3a-\\x3c\\x3e\\x40\\x5b-\\x5d\\x7f-\\xff]")
+    """
+RegExp to find characters requiring RFC 2047 encoding in subjects
+    """
+
+    @staticmethod
+    def encode(name, value):
+        """
+Returns the RFC 2047 encoded and folded value if it contains non-ASCII or
+control characters.
+
+:param name: Header name
+:param value: Header value
+
+:return: (mixed) Encoded header value
+:since:  v1.1.0
+        """
+
+        return (value
+                if ((not isinstance(value, str)) or HeaderEncoder.RE_NON_ASCII.search(value) is None) else
+                HeaderEncoder._encode(name, value)
+               )
+    #
+
+    @staticmethod
+    def encode_addresses(name, value):
+        """
+Returns the address list value with RFC 2047 encoded display names.
+
+:param name: Header name
+:param value: Comma separated list of addresses
+
+:return: (str) Encoded header value
+:since:  v1.1.0
+        """
+
+        return (value
+                if (HeaderEncoder.RE_NON_ASCII.search(value) is None) else
+                HeaderEncoder._encode_addresses(name, value)
+               )
+    #
+
+    @staticmethod
+    def encode_subject(value):
+        """
+Returns the RFC 2047 encoded and folded subject if it contains special
+characters.
+
+:param value: Subject
+
+:return: (str) Encoded subject
+:since:  v1.1.0
+        """
+
+        return (value
+                if (HeaderEncoder.RE_SUBJECT_SPECIAL.search(value) is None) else
+                HeaderEncoder._encode("Subject", value)
+               )
+    #
+
+    @staticmethod
+    @lru_cache(maxsize = CACHE_SIZE)
+    def format_address(display_name, address):
+        """
+Formats the given display name and e-mail address to an RFC compliant
+string.
+
+:param display_name: Display name
+:param address: E-mail address
+
+:return: (str) RFC compliant string
+:since:  v1.1.0
+        """
+
+        return formataddr(( display_name, address ))
+    #
+
+    @staticmethod
+    def get_cache_info():
+        """
+Returns the statistics of the memo caches.
+
+:return: (dict) Dictionary of cache names and "functools" cache info
+:since:  v1.1.0
+        """
+
+        return { "encode": HeaderEncoder._encode.cache_info(),
+                 "encode_addresses": HeaderEncoder._encode_addresses.cache_info(),
+                 "format_address": HeaderEncoder.format_address.cache_info()
+               }
+    #
+
+    @staticmethod
+    @lru_cache(maxsize = CACHE_SIZE)
+    def _encode(name, value):
+        """
+Returns the RFC 2047 encoded value folded to lines of 78 characters.
+
+:param name: Header name
+:param value: Header value
+
+:return: (str) Encoded header value
+:since:  v1.1.0
+        """
+
+        return Header(value, "utf-8", header_name = name).encode(linesep = "\n")
+    #
+
+    @staticmethod
+    @lru_cache(maxsize = CACHE_SIZE)
+    def _encode_addresses(name, value):
+        """
+Returns the address list with RFC 2047 encoded display names. Addresses
+are folded to separate lines if the value exceeds 78 characters.
+
+:param name: Header name
+:param value: Comma separated list of addresses
+
+:return: (str) Encoded header value
+:since:  v1.1.0
+        """
+
+        addresses = [ HeaderEncoder.format_address(display_name, address)
+                      for display_name, address in getaddresses([ value ])
+                    ]
+
+        return (", "
+                if (len(name) + sum(len(address) + 2 for address in addresses) <= 78) else
+                ",\n "
+               ).join(addresses)
+    #
+#
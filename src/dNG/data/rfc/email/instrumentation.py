@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from collections import OrderedDict
+from itertools import count
+from threading import RLock
+from time import perf_counter
+
+class Instrumentation(object):
+    """
+Opt-in instrumentation of the render hot paths. A process wide callback is
+called with the render ID, the phase name, the duration in seconds and the
+number of bytes processed. Instances of this class can be used as callback
+to collect per-render and total phase statistics. Nothing is measured if no
+callback is set.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    PHASE_ASSEMBLE = "assemble"
+    """
+Assembly of the MIME part tree
+    """
+    PHASE_ENCODE = "encode"
+    """
+Content transfer encoding of part payloads
+    """
+    PHASE_HEADERS = "headers"
+    """
+Application of the message headers
+    """
+    PHASE_SERIALIZE = "serialize"
+    """
+Serialization of the MIME part tree
+    """
+
+    _callback = None
+    """
+Process wide instrumentation callback
+    """
+    _render_ids = count(1)
+    """
+Render ID generator
+    """
+
+    def __init__(self, max_renders = 1000):
+        """
+Constructor __init__(Instrumentation)
+
+:param max_renders: Maximum number of renders to keep statistics for
+
+:since: v1.1.0
+        """
+
+        self._lock = RLock()
+        """
+Thread safety lock
+        """
+        self.max_renders = max_renders
+        """
+Maximum number of renders to keep statistics for
+        """
+        self.renders = OrderedDict()
+        """
+Dictionary of render IDs with phase statistics
+        """
+        self.totals = { }
+        """
+Dictionary of total phase statistics
+        """
+    #
+
+    def __call__(self, render_id, phase, duration, byte_count):
+        """
+python.org: Called when the instance is "called" as a function.
+
+:param render_id: Render ID (None for work not related to a render)
+:param phase: Phase name
+:param duration: Duration in seconds
+:param byte_count: Number of bytes processed
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            Instrumentation._add_statistics(self.totals, phase, duration, byte_count)
+
+            if (render_id is not None):
+                if (render_id not in self.renders):
+                    self.renders[render_id] = { }
+                    if (len(self.renders) > self.max_renders): self.renders.popitem(last = False)
+                #
+
+                Instrumentation._add_statistics(self.renders[render_id], phase, duration, byte_count)
+            #
+        #
+    #
+
+    def clear(self):
+        """
+Removes all collected statistics.
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self.renders.clear()
+            self.totals = { }
+        #
+    #
+
+    @staticmethod
+    def _add_statistics(statistics, phase, duration, byte_count):
+        """
+Adds the given values to the phase statistics.
+
+:param statistics: Dictionary of phase statistics
+:param phase: Phase name
+:param duration: Duration in seconds
+:param byte_count: Number of bytes processed
+
+:since: v1.1.0
+        """
+
+        if (phase not in statistics): statistics[phase] = { "calls": 0, "duration": 0, "bytes": 0 }
+        phase_statistics = statistics[phase]
+
+        phase_statistics['calls'] += 1
+        phase_statistics['duration'] += duration
+        phase_statistics['bytes'] += byte_count
+    #
+
+    @staticmethod
+    def get_callback():
+        """
+Returns the process wide instrumentation callback.
+
+:return: (object) Callback; None if disabled
+:since:  v1.1.0
+        """
+
+        return Instrumentation._callback
+    #
+
+    @staticmethod
+    def get_render_id():
+        """
+Returns a new unique render ID.
+
+:return: (int) Render ID
+:since:  v1.1.0
+        """
+
+        return next(Instrumentation._render_ids)
+    #
+
+    @staticmethod
+    def iter_measured_chunks(chunks, callback, render_id, phase = PHASE_SERIALIZE):
+        """
+Yields the given chunks and reports the time spent producing them as well
+as their size when the iteration has been completed.
+
+:param chunks: Iterable of chunks
+:param callback: Instrumentation callback
+:param render_id: Render ID
+:param phase: Phase name
+
+:since: v1.1.0
+        """
+
+        byte_count = 0
+        duration = 0
+        started = perf_counter()
+
+        for chunk in chunks:
+            duration += perf_counter() - started
+            byte_count += len(chunk)
+
+            yield chunk
+            started = perf_counter()
+        #
+
+        duration += perf_counter() - started
+        callback(render_id, phase, duration, byte_count)
+    #
+
+    @staticmethod
+    def set_callback(callback):
+        """
+Sets the process wide instrumentation callback.
+
+:param callback: Callback called with the render ID, phase name, duration
+                 and byte count; None to disable instrumentation
+
+:since: v1.1.0
+        """
+
+        Instrumentation._callback = callback
+    #
+#
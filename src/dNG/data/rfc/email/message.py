@@ -17,10 +17,9 @@ https://www.direct-netware.de/redirect?licenses;mpl2
 #echo(__FILEPATH__)#
 """
 
-from email.header import Header
-from email.utils import formataddr, parseaddr
-from time import time
-import re
+from copy import copy
+from threading import RLock
+from time import perf_counter, time
 
 try:
     _PY_STR = unicode.encode
@@ -30,14 +29,26 @@ except NameError:
     _PY_UNICODE_TYPE = str
 #
 
-from dNG.data.rfc.basics import Basics
+from .address_validator import AddressValidator
+from .content_id_alias_rewriter import ContentIdAliasRewriter
+from .header_encoder import HeaderEncoder
+from .instrumentation import Instrumentation
 from .part import Part
+from .serializer import Serializer
+from .spooled_buffer import SpooledBuffer
 
 class Message(object):
     """
 An e-mail consists of at least one message body part and optional
 attachments.
 
+Messages may be rendered by several threads at the same time and may be
+modified while being rendered. Each render uses the MIME part tree of the
+revision current at its start; that tree is never modified afterwards.
+Modifications through the methods and properties of this class are
+serialized by a lock. Direct modifications of the public lists and of
+added parts are neither tracked nor synchronized.
+
 :author:    direct Netware Group
 :copyright: (C) direct Netware Group - All rights reserved
 :package:   rfc_email.py
@@ -68,6 +79,31 @@ List of message bodies added
         self.body_related_list = [ ]
         """
 List of attachments
+        """
+        self._content_id_aliases = { }
+        """
+Dictionary of Content-IDs of deduplicated parts and the Content-ID of the
+part used instead
+        """
+        self._deterministic = False
+        """
+True to derive multipart boundaries from the message content
+        """
+        self._dkim_signer = None
+        """
+DKIM signer used to sign populated messages
+        """
+        self._email_message_backend = None
+        """
+"EmailMessage" backend used instead of the compat32 based serializer
+        """
+        self._lock = RLock()
+        """
+Thread safety lock
+        """
+        self._frozen_body = None
+        """
+Frozen body part shared with other messages
         """
         self.headers = { }
         """
@@ -76,6 +112,10 @@ Dictionary of additional e-mail headers
         self.message = None
         """
 Populated message instance build by "_populate_message()"
+        """
+        self._recipient_indices = { "to": set(), "cc": set(), "bcc": set() }
+        """
+Sets of recipient e-mail addresses for fast membership checks
         """
         self.recipients = [ ]
         """
@@ -96,6 +136,18 @@ Reply-To e-mail address
         self.sender_address = ""
         """
 From e-mail address
+        """
+        self._revision = 0
+        """
+Revision incremented on each modification of the message
+        """
+        self._populated_revision = None
+        """
+Revision of the message populated by "_populate_message()"
+        """
+        self._serialized_data = None
+        """
+Tuple of the revision, line separator and formatted message last rendered
         """
         self._subject = ""
         """
@@ -103,6 +155,41 @@ e-mail subject
         """
     #
 
+    def __getstate__(self):
+        """
+python.org: Classes can further influence how their instances are pickled.
+
+:return: (dict) State to be pickled
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            _return = self.__dict__.copy()
+
+            del(_return['_lock'])
+
+            # Populated trees and formatted messages are rebuilt on demand
+            _return['message'] = None
+            _return['_populated_revision'] = None
+            _return['_serialized_data'] = None
+        #
+
+        return _return
+    #
+
+    def __setstate__(self, state):
+        """
+python.org: Upon unpickling, the state is passed to this method.
+
+:param state: Unpickled state
+
+:since: v1.1.0
+        """
+
+        self.__dict__.update(state)
+        self._lock = RLock()
+    #
+
     @property
     def bcc(self):
         """
@@ -125,8 +212,12 @@ Sets the bcc recipient address.
 :since: v1.0.0
         """
 
-        self.recipients_bcc = [ ]
-        self.add_bcc(address)
+        with self._lock:
+            self.recipients_bcc = [ ]
+            self._recipient_indices['bcc'] = set()
+
+            self.add_bcc(address)
+        #
     #
 
     @property
@@ -138,13 +229,19 @@ Returns the populated body element.
 :since:  v1.0.0
         """
 
+        if (self._frozen_body is not None): return self._frozen_body
         if (len(self.body_list) < 1): raise ValueError("No body has been defined")
 
+        body_list = (self.body_list
+                     if (len(self._content_id_aliases) < 1) else
+                     [ self._get_aliased_body_part(body_part) for body_part in self.body_list ]
+                    )
+
         # First handle alternative representations of the body
-        if (len(self.body_list) > 1):
+        if (len(body_list) > 1):
             body_root = Part(Part.TYPE_MULTIPART, "multipart/alternative")
-            for body_part in self.body_list: body_root.attach(body_part)
-        else: body_root = self.body_list[0]
+            for body_part in body_list: body_root.attach(body_part)
+        else: body_root = body_list[0]
 
         # If related attachments are defined we will add them now
         if (len(self.body_related_list) > 0):
@@ -178,8 +275,119 @@ Sets the cc recipient address.
 :since: v1.0.0
         """
 
-        self.recipients_cc = [ ]
-        self.add_cc(address)
+        with self._lock:
+            self.recipients_cc = [ ]
+            self._recipient_indices['cc'] = set()
+
+            self.add_cc(address)
+        #
+    #
+
+    @property
+    def content_id_aliases(self):
+        """
+Returns the Content-ID aliases of deduplicated parts.
+
+:return: (dict) Dictionary of Content-ID aliases and the Content-ID used
+         instead
+:since:  v1.1.0
+        """
+
+        with self._lock: _return = self._content_id_aliases.copy()
+        return _return
+    #
+
+    @property
+    def deterministic(self):
+        """
+Returns true if multipart boundaries are derived from the message content.
+
+:return: (bool) True if deterministic
+:since:  v1.1.0
+        """
+
+        return self._deterministic
+    #
+
+    @deterministic.setter
+    def deterministic(self, deterministic):
+        """
+Sets whether multipart boundaries are derived from the message content
+instead of a random number. Messages of identical content are rendered to
+identical bytes if the "Date" header is set explicitly and all attachments
+are created with "deterministic_content_id" or an explicit Content-ID.
+
+:param deterministic: True to derive boundaries from the content
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._deterministic = deterministic
+            self._set_modified()
+        #
+    #
+
+    @property
+    def dkim_signer(self):
+        """
+Returns the DKIM signer.
+
+:return: (object) DKIM signer; None if messages are not signed
+:since:  v1.1.0
+        """
+
+        return self._dkim_signer
+    #
+
+    @dkim_signer.setter
+    def dkim_signer(self, dkim_signer):
+        """
+Sets the DKIM signer used to add a "DKIM-Signature" header. Signers may be
+shared by several messages to reuse the body hashes of frozen bodies.
+
+:param dkim_signer: DKIM signer; None to not sign the message
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._dkim_signer = dkim_signer
+            self._set_modified()
+        #
+    #
+
+    @property
+    def frozen_body(self):
+        """
+Returns the frozen body part.
+
+:return: (object) Frozen body part; None if the body is not frozen
+:since:  v1.1.0
+        """
+
+        return self._frozen_body
+    #
+
+    @frozen_body.setter
+    def frozen_body(self, part):
+        """
+Sets a frozen body part (e.g. of another message) to be used instead of
+the added bodies and related attachments.
+
+:param part: Frozen body part; None to use the added parts again
+
+:since: v1.1.0
+        """
+
+        if (part is not None and ((not isinstance(part, Part)) or (not part.is_frozen))):
+            raise TypeError("Only frozen parts can be used as frozen body")
+        #
+
+        with self._lock:
+            self._frozen_body = part
+            self._set_modified()
+        #
     #
 
     @property
@@ -203,7 +411,7 @@ Returns true if at least one recipient has been defined.
 :since:  v1.0.0
         """
 
-        return (len(self.recipients + self.recipients_bcc + self.recipients_cc) > 0)
+        return (len(self.recipients) > 0 or len(self.recipients_bcc) > 0 or len(self.recipients_cc) > 0)
     #
 
     @property
@@ -230,6 +438,46 @@ Returns true if the e-mail subject has been set.
         return (self._subject != "")
     #
 
+    @property
+    def policy(self):
+        """
+Returns the "email.policy" policy of the "EmailMessage" backend.
+
+:return: (object) Policy instance; None if the compat32 based serializer
+         is used
+:since:  v1.1.0
+        """
+
+        return (None if (self._email_message_backend is None) else self._email_message_backend.policy)
+    #
+
+    @policy.setter
+    def policy(self, policy):
+        """
+Sets an "email.policy" policy to format the message with the
+"email.message.EmailMessage" based backend instead of the compat32 based
+serializer (e.g. "email.policy.SMTPUTF8" for SMTPUTF8 transports). The
+message is then formatted as a whole and can not be DKIM signed or split
+into partial messages.
+
+:param policy: "email.policy.EmailPolicy" instance; None to use the
+               compat32 based serializer
+
+:since: v1.1.0
+        """
+
+        if (policy is None): email_message_backend = None
+        else:
+            from .email_message_backend import EmailMessageBackend
+            email_message_backend = EmailMessageBackend(policy)
+        #
+
+        with self._lock:
+            self._email_message_backend = email_message_backend
+            self._set_modified()
+        #
+    #
+
     @property
     def reply_to(self):
         """
@@ -253,7 +501,11 @@ Sets the "Reply-To" address.
         """
 
         Message.validate_address(address)
-        self.reply_to_address = address
+
+        with self._lock:
+            self.reply_to_address = address
+            self._set_modified()
+        #
     #
 
     @property
@@ -279,7 +531,50 @@ Sets the sender address.
         """
 
         Message.validate_address(address)
-        self.sender_address = address
+
+        with self._lock:
+            self.sender_address = address
+            self._set_modified()
+        #
+    #
+
+    @property
+    def storage_statistics(self):
+        """
+Returns the number of bytes of encoded payloads, frozen bodies and the
+formatted message kept for reuse held in memory and on disk. Buffers shared
+by several parts of this message are counted once.
+
+:return: (dict) Dictionary with the keys "memory" and "disk"
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            parts = self.attachment_list + self.body_list + self.body_related_list
+            if (self._frozen_body is not None): parts.append(self._frozen_body)
+            if (self.message is not None): parts.append(self.message)
+
+            buffers = { }
+
+            for part in parts:
+                for sub_part in part.walk():
+                    for buffer in getattr(sub_part, "storage_buffers", ( )): buffers[id(buffer)] = buffer
+                #
+            #
+
+            if (self._serialized_data is not None): buffers[id(self._serialized_data[2])] = self._serialized_data[2]
+        #
+
+        _return = { "memory": 0, "disk": 0 }
+
+        for buffer in buffers.values():
+            memory_size, disk_size = SpooledBuffer.get_storage_sizes(buffer)
+
+            _return['memory'] += memory_size
+            _return['disk'] += disk_size
+        #
+
+        return _return
     #
 
     @property
@@ -304,7 +599,10 @@ Sets the e-mail subject.
 :since: v1.0.0
         """
 
-        self._subject = subject.strip()
+        with self._lock:
+            self._subject = subject.strip()
+            self._set_modified()
+        #
     #
 
     @property
@@ -329,8 +627,12 @@ Sets the recipient address.
 :since: v1.0.0
         """
 
-        self.recipients = [ ]
-        self.add_to(address)
+        with self._lock:
+            self.recipients = [ ]
+            self._recipient_indices['to'] = set()
+
+            self.add_to(address)
+        #
     #
 
     def add_attachment(self, part):
@@ -351,7 +653,9 @@ Adds an e-mail attachment.
            ):
             raise TypeError("Only parts of type attachment can be added as attachment elements")
 
-        if (part not in self.attachment_list): self.attachment_list.append(part)
+        with self._lock:
+            if (self._add_unique_part(self.attachment_list, part, True)): self._set_modified()
+        #
     #
 
     def _add_attachments_to_multipart(self, part):
@@ -375,8 +679,7 @@ Adds the bcc recipient address.
 :since: v0.1.0
         """
 
-        Message.validate_address(address)
-        if (address not in self.recipients_bcc): self.recipients_bcc.append(address)
+        self.add_recipients([ address ], "bcc")
     #
 
     def add_body(self, part):
@@ -394,7 +697,12 @@ preferred representation.
             or part.type != Part.TYPE_MESSAGE_BODY
            ): raise TypeError("Only parts of type message body can be added as body elements")
 
-        if (part not in self.body_list): self.body_list.append(part)
+        with self._lock:
+            if (part not in self.body_list): self.body_list.append(part)
+
+            self._frozen_body = None
+            self._set_modified()
+        #
     #
 
     def add_body_related_attachment(self, part):
@@ -415,7 +723,12 @@ Adds an e-mail attachment related to the message body.
            ):
             raise TypeError("Only parts of type attachment can be added as body related elements")
 
-        if (part not in self.body_related_list): self.body_related_list.append(part)
+        with self._lock:
+            self._add_unique_part(self.body_related_list, part)
+
+            self._frozen_body = None
+            self._set_modified()
+        #
     #
 
     def _add_body_to_multipart(self, part):
@@ -430,6 +743,53 @@ Appends the body to the given message part.
         part.attach(self._body)
     #
 
+    def _add_unique_part(self, parts, part, is_file_name_relevant = False):
+        """
+Appends the given part to the list if it does not contain a part of the
+same content yet. Content digests are only calculated for parts of the same
+MIME type and never for sources that can only be read once. The
+Content-ID of a duplicate is recorded as alias and body
+references are rewritten to the Content-ID of the part already added.
+
+:param parts: List of parts
+:param part: Part to be added
+:param is_file_name_relevant: True if parts with different file names are
+                              not considered as duplicates
+
+:return: (bool) True if added
+:since:  v1.1.0
+        """
+
+        _return = True
+
+        # Sources that can only be read once are never compared as
+        # calculating the digest would consume them.
+        is_comparable = (not part.is_single_use_source)
+
+        for added_part in parts:
+            if (added_part is part
+                or (is_comparable
+                    and (not added_part.is_single_use_source)
+                    and added_part.get_content_type() == part.get_content_type()
+                    and ((not is_file_name_relevant)
+                         or (added_part.type == part.type and added_part.get_filename() == part.get_filename())
+                        )
+                    and added_part.content_digest == part.content_digest
+                   )
+               ):
+                if (added_part is not part and added_part.content_id != part.content_id):
+                    self._content_id_aliases[part.content_id] = added_part.content_id
+                #
+
+                _return = False
+                break
+            #
+        #
+
+        if (_return): parts.append(part)
+        return _return
+    #
+
     def add_cc(self, address):
         """
 Adds the cc recipient address.
@@ -439,8 +799,62 @@ Adds the cc recipient address.
 :since: v0.1.0
         """
 
-        Message.validate_address(address)
-        if (address not in self.recipients_cc): self.recipients_cc.append(address)
+        self.add_recipients([ address ], "cc")
+    #
+
+    def add_content_id_alias(self, alias, content_id):
+        """
+Adds a Content-ID alias. "cid:" references to the alias in message bodies
+are rewritten to the given Content-ID.
+
+:param alias: Content-ID alias
+:param content_id: Content-ID to be used instead
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._content_id_aliases[alias] = content_id
+
+            self._frozen_body = None
+            self._set_modified()
+        #
+    #
+
+    def add_recipients(self, addresses, kind = "to"):
+        """
+Adds all given recipient addresses. Addresses are validated before any of
+them is added and duplicates are ignored.
+
+:param addresses: Iterable of ASCII e-mail addresses
+:param kind: Recipient kind ("to", "cc" or "bcc")
+
+:since: v1.1.0
+        """
+
+        if (kind not in self._recipient_indices): raise ValueError("Given recipient kind is not supported")
+
+        addresses = list(addresses)
+        errors = AddressValidator.validate_many(addresses)
+
+        if (len(errors) > 0): raise next(iter(errors.values()))
+
+        with self._lock:
+            if (kind == "to"): recipients = self.recipients
+            elif (kind == "cc"): recipients = self.recipients_cc
+            else: recipients = self.recipients_bcc
+
+            recipient_index = self._recipient_indices[kind]
+
+            for address in addresses:
+                if (address not in recipient_index):
+                    recipient_index.add(address)
+                    recipients.append(address)
+                #
+            #
+
+            self._set_modified()
+        #
     #
 
     def add_to(self, address):
@@ -452,8 +866,7 @@ Adds the recipient address.
 :since: v0.1.0
         """
 
-        Message.validate_address(address)
-        if (address not in self.recipients): self.recipients.append(address)
+        self.add_recipients([ address ], "to")
     #
 
     def _apply_headers(self, part):
@@ -465,52 +878,325 @@ Sets the e-mail headers of the given message part.
 :since: v0.1.0
         """
 
-        if (self.sender_address != ""): part['From'] = self.sender_address
+        if (self.sender_address != ""): part['From'] = HeaderEncoder.encode_addresses("From", self.sender_address)
         part['To'] = (", ".join(self.recipients) if (len(self.recipients) > 0) else "undisclosed-recipients")
         if (len(self.recipients_cc) > 0): part['cc'] = ", ".join(self.recipients_cc)
-        if (self.reply_to_address != ""): part['Reply-To'] = ", ".join(self.reply_to_address)
+        if (self.reply_to_address != ""): part['Reply-To'] = HeaderEncoder.encode_addresses("Reply-To", self.reply_to_address)
 
-        if ("Date" not in part): part['Date'] = Basics.get_rfc5322_datetime(time())
+        if ("date" not in self.headers):
+            from dNG.data.rfc.basics import Basics
+            part['Date'] = Basics.get_rfc5322_datetime(time())
+        #
 
-        part['Subject'] = (self._subject
-                           if (re.search("[\\x00-\\x19\\x22\\x28\\x29\\x2c\\x2e\\x3a-\\x3c\\x3e\\x40\\x5b-\\x5d\\x7f-\\xff]", self._subject) is None) else
-                           Header(self._subject, "utf-8")
-                          )
+        part['Subject'] = HeaderEncoder.encode_subject(self._subject)
 
-        for name in self.headers: part[name] = self.headers[name]
+        for name in self.headers: part[name] = HeaderEncoder.encode(name, self.headers[name])
+    #
+
+    def as_bytes(self, linesep = "\n"):
+        """
+Returns the entire formatted message as bytes without converting it to a
+string.
+
+:param linesep: Line separator to be used
+
+:return: (bytes) Formatted message
+:since:  v1.1.0
+        """
+
+        return self._get_serialized_data(linesep)
     #
 
     def as_string(self):
         """
-python.org: Return the entire formatted message as a string.
+python.org: Return the entire formatted message as a string. "8bit" and
+"binary" payloads are decoded as UTF-8 while undecodable bytes are kept as
+surrogate escapes.
 
 :return: (str) Formatted message
 :since:  v0.1.0
         """
 
-        self._populate_message()
-        return self.message.as_string()
+        # global: _PY_STR
+
+        return _PY_STR(self._get_serialized_data("\n"), "utf-8", "surrogateescape")
     #
 
-    def _populate_message(self):
+    def estimated_size(self, linesep = "\n"):
         """
-python.org: Return the entire formatted message as a string.
+Returns the exact size of the formatted message (e.g. for the SMTP "SIZE"
+parameter). Only headers are encoded while the sizes of frozen bodies,
+payloads given as data and base64 encoded seekable sources are calculated.
+Other source based parts are read and encoded to count the bytes. The
+message is formatted completely if the "EmailMessage" backend is used.
+Sizes of non-seekable sources can not be calculated and raise a
+"ValueError".
 
-:since: v0.1.0
+:param linesep: Line separator to be used
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        serialized_data = self._get_cached_serialized_data(linesep)
+
+        if (serialized_data is not None): _return = len(serialized_data)
+        elif (self._email_message_backend is not None): _return = len(self._get_serialized_data(linesep))
+        else: _return = Serializer(linesep, self._deterministic).get_size(self._populate_message())
+
+        return _return
+    #
+
+    def freeze_body(self):
+        """
+Freezes the body consisting of all added bodies and related attachments.
+The frozen body is serialized once and the bytes are reused for each render
+of this message and of all other messages it is set for as "frozen_body".
+Adding bodies or related attachments afterwards discards the frozen body.
+
+:return: (object) Frozen body part
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            if (self._frozen_body is None):
+                body = self._body
+                if (body.type == Part.TYPE_MESSAGE_BODY): body = copy(body)
+
+                body.freeze(self._deterministic)
+
+                self._frozen_body = body
+                self._set_modified()
+            #
+
+            _return = self._frozen_body
+        #
+
+        return _return
+    #
+
+    def _get_aliased_body_part(self, part):
         """
+Returns the given body part with "cid:" references to Content-ID aliases
+of deduplicated parts rewritten. Source based bodies are rewritten while
+being read.
 
-        if (not self.is_subject_set): raise ValueError("No subject defined for e-mail")
+:param part: Message body part
 
-        if (len(self.attachment_list) > 0):
-            self.message = Part(Part.TYPE_MULTIPART, "multipart/mixed")
-            self._apply_headers(self.message)
-            self._add_body_to_multipart(self.message)
+:return: (object) Message body part
+:since:  v1.1.0
+        """
+
+        rewriter = ContentIdAliasRewriter(self._content_id_aliases, part)
+        transfer_encoding = part.get("Content-Transfer-Encoding")
+
+        if (part.is_source_based):
+            # Rewritten bodies of iterators can only be read once as well
+            data = (iter(rewriter) if (part.is_single_use_source) else rewriter)
+            _return = Part(Part.TYPE_MESSAGE_BODY, part.get_content_type(), data, transfer_encoding = transfer_encoding)
         else:
-            self.message = self._body
-            self._apply_headers(self.message)
+            data, count = rewriter.rewrite(part.get_payload(decode = True))
+            _return = (part if (count < 1) else Part(Part.TYPE_MESSAGE_BODY, part.get_content_type(), data, transfer_encoding = transfer_encoding))
         #
 
-        self._add_attachments_to_multipart(self.message)
+        return _return
+    #
+
+    def _get_cached_serialized_data(self, linesep):
+        """
+Returns the formatted message kept for reuse if it is current.
+
+:param linesep: Line separator to be used
+
+:return: (object) Formatted message as bytes or spooled buffer; None if
+         not available
+:since:  v1.1.0
+        """
+
+        serialized_data = self._serialized_data
+
+        return (serialized_data[2]
+                if (serialized_data is not None
+                    and serialized_data[0] == self._revision
+                    and serialized_data[1] == linesep
+                   ) else
+                None
+               )
+    #
+
+    def _get_serialized_data(self, linesep):
+        """
+Returns the formatted message. The result is kept until the message is
+modified. Chunks are written to a spooled buffer while being formatted if
+the spooled buffer threshold is set and the message is kept in it if it is
+larger than the threshold.
+
+:param linesep: Line separator to be used
+
+:return: (bytes) Formatted message
+:since:  v1.1.0
+        """
+
+        # The revision is read first as the message may be modified while
+        # being rendered.
+        revision = self._revision
+        serialized_data = self._get_cached_serialized_data(linesep)
+
+        if (serialized_data is None):
+            serialized_data = SpooledBuffer.join(self.iter_chunks(linesep))
+            self._serialized_data = ( revision, linesep, serialized_data )
+        #
+
+        _return = (serialized_data.getvalue() if (isinstance(serialized_data, SpooledBuffer)) else serialized_data)
+
+        return _return
+    #
+
+    def iter_chunks(self, linesep = "\n"):
+        """
+Returns a generator yielding the formatted message incrementally as encoded
+chunks. Headers and each part are emitted separately so that the message is
+never held in memory as a whole.
+
+The populated MIME part tree is reused as long as the message is not
+modified. A formatted message kept by "as_string()" and messages formatted
+by the "EmailMessage" backend are returned as one chunk unless kept in a
+spooled buffer.
+
+:param linesep: Line separator to be used
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        serialized_data = self._get_cached_serialized_data(linesep)
+        callback = Instrumentation.get_callback()
+
+        if (isinstance(serialized_data, SpooledBuffer)): _return = serialized_data.iter_blocks()
+        elif (serialized_data is not None): _return = iter([ serialized_data ])
+        elif (self._email_message_backend is not None):
+            message = self._populate_message()
+            _return = iter([ self._email_message_backend.as_bytes(message, linesep) ])
+        elif (callback is None): _return = Serializer(linesep, self._deterministic).iter_chunks(self._populate_message())
+        else:
+            render_id = Instrumentation.get_render_id()
+            message = self._populate_message(render_id)
+
+            _return = Instrumentation.iter_measured_chunks(Serializer(linesep, self._deterministic).iter_chunks(message),
+                                                           callback,
+                                                           render_id
+                                                          )
+        #
+
+        return _return
+    #
+
+    def iter_partial_messages(self, fragment_size, linesep = "\n", partial_id = None):
+        """
+Returns a generator yielding the message split into RFC 2046
+"message/partial" fragments of at most the given size. Fragments are
+generated incrementally and the message is never held in memory as a
+whole.
+
+:param fragment_size: Maximum size of each fragment in bytes
+:param linesep: Line separator to be used
+:param partial_id: Partial message ID (generated if not given)
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        from .partial_message import PartialMessage
+
+        if (self._email_message_backend is not None): raise ValueError("Partial messages are not supported by the EmailMessage backend")
+
+        message = self._populate_message()
+
+        if (partial_id is None):
+            from uuid import uuid4
+
+            partial_id = "{0}@mail".format(Serializer.get_content_digest(message).hex()[:32]
+                                           if (self._deterministic) else
+                                           uuid4().hex
+                                          )
+        #
+
+        return PartialMessage.iter_fragments(message,
+                                             fragment_size,
+                                             Serializer(linesep, self._deterministic),
+                                             partial_id
+                                            )
+    #
+
+    def _populate_message(self, render_id = None):
+        """
+Returns the populated MIME part tree of the current revision. The tree is
+built once per revision and is not modified afterwards, so that it can be
+serialized by several threads at the same time.
+
+:param render_id: Render ID used for instrumentation
+
+:return: (object) Populated message part
+:since:  v0.1.0
+        """
+
+        with self._lock:
+            if (not self.is_subject_set): raise ValueError("No subject defined for e-mail")
+
+            if (self.message is None or self._populated_revision != self._revision):
+                callback = (None if (render_id is None) else Instrumentation.get_callback())
+                if (callback is not None): started = perf_counter()
+
+                if (len(self.attachment_list) > 0):
+                    message = Part(Part.TYPE_MULTIPART, "multipart/mixed")
+                    self._add_body_to_multipart(message)
+                else:
+                    message = self._body
+
+                    # Message body parts and frozen bodies may be shared with
+                    # other messages
+                    if (message.type == Part.TYPE_MESSAGE_BODY or message.is_frozen): message = copy(message)
+                #
+
+                self._add_attachments_to_multipart(message)
+
+                if (callback is not None):
+                    callback(render_id, Instrumentation.PHASE_ASSEMBLE, perf_counter() - started, 0)
+                    started = perf_counter()
+                #
+
+                self._apply_headers(message)
+                Serializer(deterministic = self._deterministic).set_missing_boundaries(message)
+
+                if (self._dkim_signer is not None):
+                    if (self._email_message_backend is not None): raise ValueError("DKIM signing is not supported by the EmailMessage backend")
+                    self._dkim_signer.sign(message)
+                #
+
+                if (callback is not None): callback(render_id, Instrumentation.PHASE_HEADERS, perf_counter() - started, 0)
+
+                self.message = message
+                self._populated_revision = self._revision
+            #
+
+            _return = self.message
+        #
+
+        return _return
+    #
+
+    def _set_modified(self):
+        """
+Marks the message as modified. Populated MIME part trees and formatted
+messages are rebuilt on the next render.
+
+Please note that direct modifications of the recipient, body or attachment
+lists as well as of added parts are not tracked.
+
+:since: v1.1.0
+        """
+
+        self._revision += 1
     #
 
     def set_header(self, name, value):
@@ -523,11 +1209,29 @@ Sets a header.
 :since: v0.1.1
         """
 
-        name = name.lower()
+        with self._lock:
+            name = name.lower()
+
+            if (value is None):
+                if (name in self.headers): del(self.headers[name])
+            elif (name not in self.headers): self.headers[name] = value
+
+            self._set_modified()
+        #
+    #
+
+    def write_to(self, fp, linesep = "\n"):
+        """
+Writes the formatted message incrementally to the given binary file-like
+object.
+
+:param fp: Binary file-like object (e.g. a socket file or spool file)
+:param linesep: Line separator to be used
 
-        if (value is None):
-            if (name in self.headers): del(self.headers[name])
-        elif (name not in self.headers): self.headers[name] = value
+:since: v1.1.0
+        """
+
+        for chunk in self.iter_chunks(linesep): fp.write(chunk)
     #
 
     @staticmethod
@@ -542,7 +1246,28 @@ Formats the given text value and e-mail address to an RFC compliant string.
 :since:  v0.1.0
         """
 
-        return formataddr(( value, email ))
+        return HeaderEncoder.format_address(value, email)
+    #
+
+    @staticmethod
+    def render_many(messages, workers = None, linesep = "\n"):
+        """
+Renders the given messages in parallel using a pool of worker processes.
+
+:param messages: Iterable of messages
+:param workers: Number of worker processes (defaults to the number of CPUs)
+:param linesep: Line separator to be used
+
+:return: (object) Generator yielding the formatted messages as bytes in the
+         given order
+:since:  v1.1.0
+        """
+
+        from .renderer import Renderer
+
+        with Renderer(workers, linesep = linesep) as renderer:
+            for data in renderer.render(messages): yield data
+        #
     #
 
     @staticmethod
@@ -553,11 +1278,6 @@ Validates the e-mail of the given address.
 :since: v0.1.0
         """
 
-        # global: _PY_STR, _PY_UNICODE_TYPE
-
-        address_data = parseaddr(address)
-        if (str is not _PY_UNICODE_TYPE and type(address_data[1]) is _PY_UNICODE_TYPE): address_data[1] = _PY_STR(address_data[1], "utf-8")
-
-        if (address_data[1] == ""): raise TypeError("Given e-mail is not valid")
+        AddressValidator.validate(address)
     #
 #
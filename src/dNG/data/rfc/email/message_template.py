@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from string import Template
+
+try:
+    _PY_STR = unicode.encode
+    _PY_UNICODE_TYPE = unicode
+except NameError:
+    _PY_STR = bytes.decode
+    _PY_UNICODE_TYPE = str
+#
+
+from .message import Message
+from .part import Part
+
+class MessageTemplate(object):
+    """
+A message template is compiled once from a message and renders
+per-recipient variants of it. Placeholders in the subject and in message
+bodies use the "string.Template" syntax (e.g. "${name}"). Bodies without
+placeholders, related parts and attachments are encoded only once and shared
+by all rendered messages. The body is frozen and serialized only once if no
+body contains placeholders.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    def __init__(self, message):
+        """
+Constructor __init__(MessageTemplate)
+
+:param message: Message to compile the template from
+
+:since: v1.1.0
+        """
+
+        if (not isinstance(message, Message)): raise TypeError("Only messages can be compiled to a template")
+
+        self.attachment_list = list(message.attachment_list)
+        """
+List of shared attachments
+        """
+        self.body_list = [ ]
+        """
+List of shared message body parts or tuples of the MIME type, the body
+template and the Content-Transfer-Encoding or mode requested
+        """
+        self.body_related_list = list(message.body_related_list)
+        """
+List of shared attachments related to the message body
+        """
+        self.content_id_aliases = message.content_id_aliases
+        """
+Dictionary of Content-ID aliases of deduplicated parts
+        """
+        self.deterministic = message.deterministic
+        """
+True to derive multipart boundaries from the message content
+        """
+        self.dkim_signer = message.dkim_signer
+        """
+DKIM signer used to sign rendered messages
+        """
+        self._frozen_body = None
+        """
+Frozen body shared by all rendered messages if no body contains
+placeholders
+        """
+        self.headers = message.headers.copy()
+        """
+Dictionary of additional e-mail headers
+        """
+        self.policy = message.policy
+        """
+"email.policy" policy of the "EmailMessage" backend; None for the default
+serializer
+        """
+        self.reply_to_address = message.reply_to
+        """
+Reply-To e-mail address
+        """
+        self.sender_address = message.sender
+        """
+From e-mail address
+        """
+        self.subject = MessageTemplate._get_template(message.subject)
+        """
+e-mail subject or subject template
+        """
+
+        for part in message.body_list: self.body_list.append(MessageTemplate._get_body_template(part))
+        if (self.is_body_shared): self._frozen_body = message.frozen_body
+    #
+
+    @property
+    def is_body_shared(self):
+        """
+Returns true if no body contains placeholders.
+
+:return: (bool) True if the body is shared by all rendered messages
+:since:  v1.1.0
+        """
+
+        _return = True
+
+        for body in self.body_list:
+            if (not isinstance(body, Part)):
+                _return = False
+                break
+            #
+        #
+
+        return _return
+    #
+
+    def render(self, substitutions = None, to = None, cc = None, bcc = None):
+        """
+Renders a message for the given substitutions and recipients.
+
+:param substitutions: Dictionary of placeholder substitutions
+:param to: Recipient address or list of addresses
+:param cc: Cc recipient address or list of addresses
+:param bcc: Bcc recipient address or list of addresses
+
+:return: (object) Message instance
+:since:  v1.1.0
+        """
+
+        if (substitutions is None): substitutions = { }
+
+        _return = Message()
+        _return.deterministic = self.deterministic
+        _return.dkim_signer = self.dkim_signer
+        _return.policy = self.policy
+
+        if (self.sender_address != ""): _return.sender = self.sender_address
+        if (self.reply_to_address != ""): _return.reply_to = self.reply_to_address
+
+        _return.subject = (self.subject.safe_substitute(substitutions)
+                           if (isinstance(self.subject, Template)) else
+                           self.subject
+                          )
+
+        for name in self.headers: _return.set_header(name, self.headers[name])
+
+        for address in MessageTemplate._get_address_list(to): _return.add_to(address)
+        for address in MessageTemplate._get_address_list(cc): _return.add_cc(address)
+        for address in MessageTemplate._get_address_list(bcc): _return.add_bcc(address)
+
+        for body in self.body_list:
+            if (isinstance(body, Part)): _return.add_body(body)
+            else:
+                mimetype, template, transfer_encoding = body
+
+                _return.add_body(Part(Part.TYPE_MESSAGE_BODY,
+                                      mimetype,
+                                      template.safe_substitute(substitutions),
+                                      transfer_encoding = transfer_encoding
+                                     ))
+            #
+        #
+
+        for part in self.body_related_list: _return.add_body_related_attachment(part)
+        for part in self.attachment_list: _return.add_attachment(part)
+
+        for alias in self.content_id_aliases: _return.add_content_id_alias(alias, self.content_id_aliases[alias])
+
+        if (self._frozen_body is not None): _return.frozen_body = self._frozen_body
+        elif (self.is_body_shared): self._frozen_body = _return.freeze_body()
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_address_list(addresses):
+        """
+Returns a list of addresses for the given address or iterable.
+
+:param addresses: Address or iterable of addresses
+
+:return: (list) Addresses
+:since:  v1.1.0
+        """
+
+        # global: _PY_UNICODE_TYPE
+
+        if (addresses is None): _return = [ ]
+        elif (isinstance(addresses, str) or isinstance(addresses, _PY_UNICODE_TYPE)): _return = [ addresses ]
+        else: _return = addresses
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_body_template(part):
+        """
+Returns the shared part if it does not contain placeholders or a tuple of
+the MIME type, the body template and the Content-Transfer-Encoding or mode
+requested for the part. Bodies not encoded in UTF-8 are shared.
+
+:param part: Message body part
+
+:return: (mixed) Part or tuple
+:since:  v1.1.0
+        """
+
+        # global: _PY_STR
+
+        _return = part
+
+        if (not part.is_source_based):
+            try: body = _PY_STR(part.get_payload(decode = True), "utf-8")
+            except UnicodeDecodeError: body = None
+
+            template = (None if (body is None) else MessageTemplate._get_template(body))
+            if (isinstance(template, Template)):
+                _return = ( part.get_content_type(), template, part.requested_transfer_encoding )
+            #
+        #
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_template(value):
+        """
+Returns a template for the given value if it contains placeholders.
+
+:param value: Value
+
+:return: (mixed) Template instance or the unchanged value
+:since:  v1.1.0
+        """
+
+        _return = value
+
+        if ("$" in value):
+            template = Template(value)
+
+            for result in template.pattern.finditer(value):
+                if (result.group("named") is not None or result.group("braced") is not None):
+                    _return = template
+                    break
+                #
+            #
+        #
+
+        return _return
+    #
+#
@@ -19,9 +19,14 @@ https://www.direct-netware.de/redirect?licenses;mpl2
 
 # pylint: disable=invalid-name
 
-from base64 import b64encode
+from binascii import a2b_base64
 from email.message import Message
-from quopri import encodestring
+from itertools import count
+from os import path
+from quopri import decodestring
+from threading import Lock
+from time import perf_counter
+import re
 
 try:
     _PY_BYTES = unicode.encode
@@ -35,6 +40,14 @@ except NameError:
     _PY_UNICODE_TYPE = str
 #
 
+_NON_ASCII_BYTES = bytes(bytearray(range(128, 256)))
+
+from .encoded_payload_cache import EncodedPayloadCache
+from .encoder import Encoder
+from .instrumentation import Instrumentation
+from .serializer import Serializer
+from .spooled_buffer import SpooledBuffer
+
 class Part(Message):
     """
 This is an e-mail mime part that can be attached to a message.
@@ -47,6 +60,33 @@ This is an e-mail mime part that can be attached to a message.
             Mozilla Public License, v. 2.0
     """
 
+    RE_NON_ASCII = re.compile(b"[\\x80-\\xff]")
+    """
+RegExp to find data not allowed for "7bit" encoded payloads
+    """
+    RE_NON_LINE_DATA = re.compile(b"\\x00|\\r(?!\\n)|[^\\r\\n]{999}")
+    """
+RegExp to find data not allowed for "7bit" and "8bit" encoded payloads
+    """
+    SOURCE_BLOCK_SIZE = 57 * 1024
+    """
+Size of blocks read from source based parts (multiple of 57 bytes to result
+in complete base64 lines)
+    """
+    TRANSFER_ENCODING_AUTO = "auto"
+    """
+Selects the smallest valid encoding of "7bit", "quoted-printable" and
+"base64"
+    """
+    TRANSFER_ENCODING_AUTO_8BIT = "auto-8bit"
+    """
+Selects the smallest valid encoding including "8bit" (requires 8BITMIME
+support of the transport)
+    """
+    TRANSFER_ENCODINGS = ( "7bit", "8bit", "base64", "quoted-printable" )
+    """
+Supported Content-Transfer-Encoding values
+    """
     TYPE_ATTACHMENT = 1
     """
 e-mail attachment
@@ -72,13 +112,41 @@ e-mail message body
 e-mail multipart body
     """
 
-    def __init__(self, _type, mimetype, data = None, file_name = None):
+    _single_use_source_counter = count()
+    """
+Process wide counter used to derive Content-IDs of sources that can only be
+read once
+    """
+    _source_lock = Lock()
+    """
+Lock used to read blocks from shared seekable sources
+    """
+
+    def __init__(self, _type, mimetype, data = None, file_name = None, file_path_name = None, transfer_encoding = None, content_id = None, deterministic_content_id = False):
         """
 Constructor __init__(Part)
 
-:param url: URL to be called
-:param timeout: Connection timeout in seconds
-:param event_handler: EventHandler to use
+Data may be given as string, as a file-like object or as a "mmap" instance.
+File-like objects, "mmap" instances and files given by "file_path_name" are
+read and encoded only when the part is serialized. Message body data may
+be given as an iterable of string or bytes chunks (e.g. a generator of a
+template engine) as well. Chunks are encoded incrementally and iterators
+can only be serialized once.
+
+:param _type: Part type
+:param mimetype: Part MIME type
+:param data: Part data
+:param file_name: File name of the attachment
+:param file_path_name: Path and name of the file to read the data from
+:param transfer_encoding: Content-Transfer-Encoding to be used, one of the
+                          "TRANSFER_ENCODING_AUTO" modes or None for
+                          base64 if binary and quoted-printable otherwise
+:param content_id: Content-ID to be used for attachments and inline parts
+:param deterministic_content_id: True to derive a missing Content-ID from
+                                 the MIME type, the file name and the
+                                 payload instead of the part instance.
+                                 Source based parts are read once on
+                                 construction if enabled.
 
 :since: v0.1.0
         """
@@ -87,41 +155,94 @@ Constructor __init__(Part)
 
         Message.__init__(self)
 
+        self._content_digest = None
+        """
+SHA-256 digest of the transfer encoded payload
+        """
         self._content_id = None
         """
 Defines what type the given data represents.
+        """
+        self._encoded_payload = None
+        """
+Transfer encoded payload
+        """
+        self._frozen_bodies = None
+        """
+Dictionary of serialized bodies by line separator if the part is frozen
         """
         self._part_type = _type
         """
 Defines what type the given data represents.
         """
+        self._requested_transfer_encoding = transfer_encoding
+        """
+Content-Transfer-Encoding or mode requested on construction
+        """
+        self._is_source_single_use = False
+        """
+True if the source is an iterator that can only be read once
+        """
+        self._source = None
+        """
+File-like object, "mmap" instance or iterable of chunks the payload is
+read from
+        """
+        self._source_file_path_name = None
+        """
+Path and name of the file the payload is read from
+        """
+        self._source_offset = None
+        """
+Position of the payload data in a seekable file-like object
+        """
 
         self.set_type(mimetype)
-        if (self._part_type != Part.TYPE_MULTIPART and data is None): raise TypeError("Given data type is not supported")
 
+        if (file_path_name is not None):
+            if (data is not None): raise TypeError("Data and a file path can not be given at the same time")
+            if (file_name is None): file_name = path.basename(file_path_name)
+        elif (self._part_type != Part.TYPE_MULTIPART and data is None): raise TypeError("Given data type is not supported")
+
+        is_source = (file_path_name is not None
+                     or hasattr(data, "read")
+                     or (self._part_type == Part.TYPE_MESSAGE_BODY
+                         and (not isinstance(data, ( _PY_BYTES_TYPE, _PY_UNICODE_TYPE, bytearray, memoryview )))
+                         and hasattr(data, "__iter__")
+                        )
+                    )
         payload = None
 
         if (self._part_type == Part.TYPE_BINARY_ATTACHMENT or self._part_type == Part.TYPE_BINARY_INLINE):
-            if (str is not _PY_BYTES_TYPE and type(data) is str): data = _PY_BYTES(data, "raw_unicode_escape")
-            if (type(data) != _PY_BYTES_TYPE): raise TypeError("Given data type is not supported")
+            if (not is_source):
+                if (str is not _PY_BYTES_TYPE and type(data) is str): data = _PY_BYTES(data, "raw_unicode_escape")
+                if (type(data) != _PY_BYTES_TYPE): raise TypeError("Given data type is not supported")
+            #
+
+            transfer_encoding = Part._select_transfer_encoding(None if (is_source) else data, transfer_encoding, "base64", True)
+            self.add_header("Content-Transfer-Encoding", transfer_encoding)
 
-            self.add_header("Content-Transfer-Encoding", "base64")
-            payload = b64encode(data)
+            if (not is_source): payload = self._get_encoded_payload(data, transfer_encoding)
         elif (self._part_type == Part.TYPE_ATTACHMENT
               or self._part_type == Part.TYPE_INLINE
               or self._part_type == Part.TYPE_MESSAGE_BODY
              ):
-            if (str is not _PY_BYTES_TYPE and type(data) is str): data = _PY_BYTES(data, "utf-8")
-            if (type(data) is not _PY_BYTES_TYPE): raise TypeError("Given data type is not supported")
+            if (not is_source):
+                if (str is not _PY_BYTES_TYPE and type(data) is str): data = _PY_BYTES(data, "utf-8")
+                if (type(data) is not _PY_BYTES_TYPE): raise TypeError("Given data type is not supported")
+            #
 
-            self.add_header("Content-Transfer-Encoding", "quoted-printable")
+            transfer_encoding = Part._select_transfer_encoding(None if (is_source) else data, transfer_encoding, "quoted-printable")
+
+            self.add_header("Content-Transfer-Encoding", transfer_encoding)
             self.set_param("charset", "UTF-8", "Content-Type")
-            payload = encodestring(data)
+
+            if (not is_source): payload = self._get_encoded_payload(data, transfer_encoding)
         #
 
-        if (payload is not None):
-            if (type(payload) is not str): payload = _PY_STR(payload, "raw_unicode_escape")
-            self.set_payload(payload)
+        if (payload is not None): self._encoded_payload = payload
+        elif (is_source and self._part_type != Part.TYPE_MULTIPART):
+            self._set_source(data, file_path_name)
         #
 
         if (self._part_type == Part.TYPE_ATTACHMENT
@@ -132,7 +253,14 @@ Defines what type the given data represents.
             if (str != _PY_UNICODE_TYPE and type(file_name) is _PY_UNICODE_TYPE): file_name = _PY_STR(file_name, "utf-8")
             if (type(file_name) is not str): raise TypeError("Given file name type is not supported")
 
-            self._content_id = "cid{0:d}@mail".format(id(self))
+            if (content_id is None):
+                content_id = (self._get_content_digest_id(mimetype, file_name)
+                              if (deterministic_content_id) else
+                              "cid{0:d}@mail".format(id(self))
+                             )
+            elif (type(content_id) is not str): raise TypeError("Given Content-ID type is not supported")
+
+            self._content_id = content_id
             self.add_header("Content-ID", "<{0}>".format(self._content_id))
 
             disposition_type = ("attachment"
@@ -144,6 +272,22 @@ Defines what type the given data represents.
         #
     #
 
+    def __copy__(self):
+        """
+python.org: Called to implement the copy operation. Headers are copied
+while the payload is shared with the original part.
+
+:return: (object) Copied part
+:since:  v1.1.0
+        """
+
+        _return = self.__class__.__new__(self.__class__)
+        _return.__dict__.update(self.__dict__)
+        _return._headers = list(self._headers)
+
+        return _return
+    #
+
     @property
     def content_id(self):
         """
@@ -156,6 +300,115 @@ Return the part type.
         return self._content_id
     #
 
+    @property
+    def content_digest(self):
+        """
+Returns the SHA-256 digest of the transfer encoded payload. Source based
+parts are read once to calculate it.
+
+:return: (bytes) Content digest
+:since:  v1.1.0
+        """
+
+        if (self._content_digest is None):
+            if (self.is_single_use_source): raise ValueError("Digests of sources that can only be read once can not be calculated without consuming them")
+
+            from hashlib import sha256
+
+            content_digest = sha256()
+            for data in self.iter_encoded_payload(): content_digest.update(data)
+
+            self._content_digest = content_digest.digest()
+        #
+
+        return self._content_digest
+    #
+
+    @property
+    def frozen_bodies(self):
+        """
+Returns the dictionary of serialized bodies by line separator used by the
+serializer for frozen parts.
+
+:return: (dict) Serialized bodies; None if the part is not frozen
+:since:  v1.1.0
+        """
+
+        return self._frozen_bodies
+    #
+
+    @property
+    def is_frozen(self):
+        """
+Returns true if the part is frozen.
+
+:return: (bool) True if frozen
+:since:  v1.1.0
+        """
+
+        return (self._frozen_bodies is not None)
+    #
+
+    @property
+    def is_single_use_source(self):
+        """
+Returns true if the payload is read from an iterator or a non-seekable
+file-like object that can only be read once.
+
+:return: (bool) True if the source can only be read once
+:since:  v1.1.0
+        """
+
+        return (self._is_source_single_use
+                or (self._source_file_path_name is None
+                    and self._source_offset is None
+                    and hasattr(self._source, "read")
+                   )
+               )
+    #
+
+    @property
+    def is_source_based(self):
+        """
+Returns true if the payload is read from a file or file-like object on
+demand.
+
+:return: (bool) True if source based
+:since:  v1.1.0
+        """
+
+        return (self._source is not None or self._source_file_path_name is not None)
+    #
+
+    @property
+    def requested_transfer_encoding(self):
+        """
+Returns the Content-Transfer-Encoding or "TRANSFER_ENCODING_AUTO" mode
+requested on construction.
+
+:return: (str) Content-Transfer-Encoding or mode; None for the default
+:since:  v1.1.0
+        """
+
+        return self._requested_transfer_encoding
+    #
+
+    @property
+    def storage_buffers(self):
+        """
+Returns the encoded payload and the frozen bodies held by this part without
+the ones of its sub parts.
+
+:return: (list) List of bytes and spooled buffers
+:since:  v1.1.0
+        """
+
+        _return = ([ ] if (self._encoded_payload is None) else [ self._encoded_payload ])
+        if (self._frozen_bodies is not None): _return += self._frozen_bodies.values()
+
+        return _return
+    #
+
     @property
     def type(self):
         """
@@ -167,4 +420,431 @@ Return the part type.
 
         return self._part_type
     #
-#
+
+    def attach(self, payload):
+        """
+python.org: Add the given payload to the current payload.
+
+:param payload: Sub part to be attached
+
+:since: v1.1.0
+        """
+
+        if (self.is_frozen): raise ValueError("Frozen parts can not be modified")
+        Message.attach(self, payload)
+    #
+
+    def encoded_size(self, linesep = "\n"):
+        """
+Returns the exact size of the transfer encoded payload as serialized with
+the given line separator. The size of base64 encoded source based parts is
+calculated from the source size while other source based parts are encoded
+on demand to count the bytes.
+
+:param linesep: Line separator to be used
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        serializer = Serializer(linesep)
+
+        if (not self.is_source_based):
+            _return = sum(serializer.get_normalized_size(data) for data in self.iter_encoded_payload())
+        else:
+            source_size = self._get_source_size()
+            if (source_size is None): raise ValueError("Size of non-seekable sources can not be calculated without consuming them")
+
+            if (self.get("Content-Transfer-Encoding") == "base64"):
+                encoded_size = 4 * ((source_size + 2) // 3)
+                lines = (encoded_size + Encoder.LINE_LENGTH - 1) // Encoder.LINE_LENGTH
+
+                _return = encoded_size + max(0, lines - 1) * len(linesep)
+            else: _return = sum(serializer.get_normalized_size(data) for data in self.iter_encoded_payload())
+        #
+
+        return _return
+    #
+
+    def freeze(self, deterministic = False):
+        """
+Freezes the part. The body of a frozen part including all of its sub parts
+is serialized only once per line separator and the serialized bytes are
+reused for all messages the part is contained in. Missing multipart
+boundaries are set on freezing and sub parts must not be changed
+afterwards.
+
+:param deterministic: True to derive missing multipart boundaries from the
+                      content
+
+:since: v1.1.0
+        """
+
+        if (not self.is_frozen):
+            for part in self.walk():
+                if (part.is_multipart() and (not part.get_boundary())):
+                    part.set_boundary(Serializer.get_content_boundary(part)
+                                      if (deterministic) else
+                                      Serializer.get_boundary()
+                                     )
+                #
+            #
+
+            self._frozen_bodies = { }
+        #
+    #
+
+    def _get_content_digest_id(self, mimetype, file_name):
+        """
+Returns a Content-ID derived from the MIME type, the file name and the
+payload. Parts of identical content get identical Content-IDs. Sources that
+can only be read once are numbered in the order of their creation within
+the process instead.
+
+:param mimetype: Part MIME type
+:param file_name: File name of the attachment
+
+:return: (str) Content-ID
+:since:  v1.1.0
+        """
+
+        from hashlib import sha256
+
+        content_id_digest = sha256("{0}\x00{1}\x00".format(mimetype, file_name).encode("utf-8", "surrogateescape"))
+
+        # "next()" of "itertools.count" is atomic and safe to be called by
+        # several threads.
+        if (self.is_single_use_source):
+            content_id_digest.update("{0:d}".format(next(Part._single_use_source_counter)).encode("ascii"))
+        else: content_id_digest.update(self.content_digest)
+
+        return "cid{0}@mail".format(content_id_digest.hexdigest()[:32])
+    #
+
+    def _get_encoded_payload(self, data, transfer_encoding):
+        """
+Returns the encoded payload. Payloads of attachments are shared with other
+parts of identical data using the process wide encoded payload cache. Data
+sent as is for "7bit" and "8bit" is returned without using the cache.
+Payloads larger than the spooled buffer threshold are encoded in blocks
+into a spooled buffer instead.
+
+:param data: Raw data
+:param transfer_encoding: Content-Transfer-Encoding name
+
+:return: (object) Encoded payload as bytes or spooled buffer
+:since:  v1.1.0
+        """
+
+        if (transfer_encoding == "base64"): encoder = Encoder.encode_base64
+        elif (transfer_encoding == "quoted-printable"): encoder = Encoder.encode_quoted_printable
+        else: encoder = bytes
+
+        callback = Instrumentation.get_callback()
+        if (callback is not None): started = perf_counter()
+
+        threshold = SpooledBuffer.get_threshold()
+
+        if (threshold is not None and len(data) > threshold):
+            _return = SpooledBuffer.join(Encoder.iter_encoded(( data, ), transfer_encoding)
+                                         if (encoder is not bytes) else
+                                         ( data, )
+                                        )
+        elif (encoder is bytes): _return = data
+        elif (self._part_type == Part.TYPE_MESSAGE_BODY): _return = encoder(data)
+        else: _return = EncodedPayloadCache.get_instance().get_encoded(data, transfer_encoding, encoder)
+
+        if (callback is not None): callback(None, Instrumentation.PHASE_ENCODE, perf_counter() - started, len(_return))
+
+        return _return
+    #
+
+    def as_bytes(self, unixfrom = False, policy = None):
+        """
+python.org: Return the entire message flattened as a bytes object.
+
+:param unixfrom: Not supported and only accepted for compatibility
+:param policy: Policy to read the line separator from
+
+:return: (bytes) Formatted part
+:since:  v1.1.0
+        """
+
+        if (policy is None): policy = self.policy
+        return b"".join(Serializer(policy.linesep).iter_chunks(self))
+    #
+
+    def as_string(self, unixfrom = False, maxheaderlen = 0, policy = None):
+        """
+python.org: Return the entire message flattened as a string.
+
+:param unixfrom: Not supported and only accepted for compatibility
+:param maxheaderlen: Not supported and only accepted for compatibility
+:param policy: Policy to read the line separator from
+
+:return: (str) Formatted part
+:since:  v1.1.0
+        """
+
+        # global: _PY_STR
+
+        return _PY_STR(self.as_bytes(policy = policy), "ascii", "surrogateescape")
+    #
+
+    def get_payload(self, i = None, decode = False):
+        """
+python.org: Return the current payload, which will be a list of Message
+objects when is_multipart() is True, or a string when is_multipart() is
+False.
+
+Please note that the payload is kept as bytes internally. The string
+returned is a copy and the payload of source based parts is read and
+encoded completely to be returned.
+
+:param i: Index of the sub part to return
+:param decode: True to return the decoded payload
+
+:return: (mixed) Payload
+:since:  v1.1.0
+        """
+
+        # global: _PY_STR
+
+        if (self._encoded_payload is None and (not self.is_source_based)): _return = Message.get_payload(self, i, decode)
+        elif (i is not None): raise TypeError("Part is not multipart")
+        elif (not decode): _return = _PY_STR(b"".join(self.iter_encoded_payload()), "ascii", "surrogateescape")
+        elif (self._encoded_payload is None): _return = b"".join(self._iter_source_blocks())
+        else:
+            encoded_payload = self._encoded_payload
+            if (isinstance(encoded_payload, SpooledBuffer)): encoded_payload = encoded_payload.getvalue()
+
+            transfer_encoding = self.get("Content-Transfer-Encoding", "").lower()
+
+            if (transfer_encoding == "base64"): _return = a2b_base64(encoded_payload)
+            elif (transfer_encoding == "quoted-printable"): _return = decodestring(encoded_payload)
+            else: _return = encoded_payload
+        #
+
+        return _return
+    #
+
+    def iter_payload(self):
+        """
+Returns a generator yielding the decoded payload in blocks. Source based
+parts are read on demand.
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        return (self._iter_source_blocks() if (self.is_source_based) else iter([ self.get_payload(decode = True) ]))
+    #
+
+    def iter_encoded_payload(self):
+        """
+Returns a generator yielding the transfer encoded payload in blocks. Source
+based parts are read and encoded on demand.
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        # global: _PY_BYTES
+
+        if (self.is_source_based):
+            _return = Encoder.iter_encoded(self._iter_source_blocks(), self.get("Content-Transfer-Encoding"))
+        elif (isinstance(self._encoded_payload, SpooledBuffer)): _return = self._encoded_payload.iter_blocks()
+        else:
+            payload = (Message.get_payload(self) if (self._encoded_payload is None) else self._encoded_payload)
+            if (payload is not None and type(payload) is not bytes): payload = _PY_BYTES(payload, "ascii", "surrogateescape")
+
+            _return = iter([ payload ] if (payload) else [ ])
+        #
+
+        return _return
+    #
+
+    def set_payload(self, payload, charset = None):
+        """
+python.org: Set the entire message object's payload to payload.
+
+:param payload: Payload
+:param charset: Charset of the payload
+
+:since: v1.1.0
+        """
+
+        if (self.is_frozen): raise ValueError("Frozen parts can not be modified")
+
+        self._content_digest = None
+        self._encoded_payload = None
+        Message.set_payload(self, payload, charset)
+    #
+
+    def _get_source_size(self):
+        """
+Returns the size of the source data.
+
+:return: (int) Size in bytes; None for non-seekable sources
+:since:  v1.1.0
+        """
+
+        if (self._source_file_path_name is not None): _return = path.getsize(self._source_file_path_name)
+        elif (self._source_offset is None): _return = None
+        else:
+            with Part._source_lock:
+                self._source.seek(0, 2)
+                _return = self._source.tell() - self._source_offset
+                self._source.seek(self._source_offset)
+            #
+        #
+
+        return _return
+    #
+
+    def _iter_source_blocks(self):
+        """
+Returns a generator yielding the raw source data in blocks.
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        return (self._iter_source_chunks()
+                if (self._source_file_path_name is None and (not hasattr(self._source, "read"))) else
+                self._iter_source_file_blocks()
+               )
+    #
+
+    def _iter_source_chunks(self):
+        """
+Yields the chunks of an iterable source as bytes.
+
+:since: v1.1.0
+        """
+
+        # global: _PY_BYTES
+
+        if (self._is_source_single_use):
+            with Part._source_lock:
+                if (len(self._source) < 1): raise ValueError("Iterator sources can only be read once")
+                chunks = self._source.pop()
+            #
+        else: chunks = self._source
+
+        for data in chunks:
+            if (type(data) is not bytes): data = _PY_BYTES(data, "utf-8")
+            if (data): yield data
+        #
+    #
+
+    def _iter_source_file_blocks(self):
+        """
+Yields the raw data of a file source in blocks. Seekable sources are read
+at the position of the block requested, so that a part may be serialized
+by several threads at the same time.
+
+:since: v1.1.0
+        """
+
+        # global: _PY_BYTES
+
+        if (self._source_file_path_name is None): source = self._source
+        else: source = open(self._source_file_path_name, "rb")
+
+        position = self._source_offset
+
+        try:
+            while True:
+                if (position is None or self._source_file_path_name is not None): data = source.read(Part.SOURCE_BLOCK_SIZE)
+                else:
+                    with Part._source_lock:
+                        source.seek(position)
+                        data = source.read(Part.SOURCE_BLOCK_SIZE)
+                    #
+
+                    position += len(data)
+                #
+
+                if (not data): break
+
+                if (type(data) is not bytes): data = _PY_BYTES(data, "utf-8")
+                yield data
+            #
+        finally:
+            if (self._source_file_path_name is not None): source.close()
+        #
+    #
+
+    def _set_source(self, source, file_path_name):
+        """
+Sets the source the payload is read from on demand.
+
+:param source: File-like object, "mmap" instance or iterable of chunks
+:param file_path_name: Path and name of the file to read the data from
+
+:since: v1.1.0
+        """
+
+        if (file_path_name is None and (not hasattr(source, "read"))):
+            # Iterators are kept in a list shared with copies of this part
+            # to detect a second read.
+            if (iter(source) is source):
+                self._is_source_single_use = True
+                self._source = [ source ]
+            else: self._source = source
+        elif (file_path_name is None):
+            self._source = source
+
+            try:
+                if (source.seekable()): self._source_offset = source.tell()
+            except AttributeError: self._source_offset = source.tell()
+        else: self._source_file_path_name = file_path_name
+    #
+
+    @staticmethod
+    def _select_transfer_encoding(data, transfer_encoding, default_transfer_encoding, is_binary = False):
+        """
+Returns the Content-Transfer-Encoding to be used for the given data. The
+data is scanned once if an automatic mode is requested.
+
+:param data: Raw data; None for source based parts
+:param transfer_encoding: Requested Content-Transfer-Encoding or mode
+:param default_transfer_encoding: Content-Transfer-Encoding used by default
+:param is_binary: True if line endings of the data must be kept unchanged
+
+:return: (str) Content-Transfer-Encoding
+:since:  v1.1.0
+        """
+
+        is_auto_mode = (transfer_encoding == Part.TRANSFER_ENCODING_AUTO
+                        or transfer_encoding == Part.TRANSFER_ENCODING_AUTO_8BIT
+                       )
+
+        if (transfer_encoding is None or (is_auto_mode and (data is None or is_binary))):
+            _return = default_transfer_encoding
+        elif (is_auto_mode):
+            is_line_data = (Part.RE_NON_LINE_DATA.search(data) is None)
+
+            if (is_line_data and Part.RE_NON_ASCII.search(data) is None): _return = "7bit"
+            elif (is_line_data and transfer_encoding == Part.TRANSFER_ENCODING_AUTO_8BIT): _return = "8bit"
+            else:
+                non_ascii_count = len(data) - len(data.translate(None, _NON_ASCII_BYTES))
+
+                # quoted-printable uses three characters per non-ASCII byte
+                _return = ("quoted-printable" if (6 * non_ascii_count <= len(data)) else "base64")
+            #
+        elif (transfer_encoding not in Part.TRANSFER_ENCODINGS): raise ValueError("Given Content-Transfer-Encoding is not supported")
+        elif (transfer_encoding in ( "7bit", "8bit" )):
+            if (data is None): raise ValueError("Given Content-Transfer-Encoding is not supported for source based parts")
+
+            if (Part.RE_NON_LINE_DATA.search(data) is not None
+                or (transfer_encoding == "7bit" and Part.RE_NON_ASCII.search(data) is not None)
+               ): raise ValueError("Given data can not be represented with the Content-Transfer-Encoding requested")
+
+            _return = transfer_encoding
+        else: _return = transfer_encoding
+
+        return _return
+    #
+#
\ No newline at end of file
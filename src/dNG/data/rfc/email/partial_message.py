@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from itertools import chain
+
+class PartialMessage(object):
+    """
+"PartialMessage" splits a populated MIME part tree into RFC 2046
+"message/partial" fragments and reassembles them again. Fragments are
+generated from the serialized chunks on demand, so that only one fragment
+is held in memory at a time.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    ENCLOSED_HEADER_NAMES = ( "encrypted", "message-id", "mime-version", "subject" )
+    """
+Names of headers kept in the enclosed message header in addition to the
+"Content-" ones (RFC 2046, section 5.2.2.1)
+    """
+    FIRST_FRAGMENT_HEADER_NAMES = ( "dkim-signature", )
+    """
+Names of headers of the encapsulating message only added to the first
+fragment. Signatures are only valid for the reassembled message.
+    """
+
+    @staticmethod
+    def _get_fragment_data_size(data, position, max_size, linesep):
+        """
+Returns the size of the data to be added to the next fragment. Data is
+split after the last line ending within the maximum size if possible.
+
+:param data: Buffered data
+:param position: Position of the data not yet added to a fragment
+:param max_size: Maximum size of the fragment data
+:param linesep: Encoded line separator
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        if (max_size < 1): raise ValueError("Given fragment size is too small for the fragment headers")
+
+        if (len(data) - position <= max_size): _return = len(data) - position
+        else:
+            line_end_position = data.rfind(linesep, position, position + max_size)
+
+            _return = (max_size
+                       if (line_end_position < position) else
+                       line_end_position + len(linesep) - position
+                      )
+        #
+
+        return _return
+    #
+
+    @staticmethod
+    def _get_fragment_header_chunk(serializer, part, headers, partial_id, number, total = None):
+        """
+Returns the encoded header block of a fragment. Headers only given in the
+first fragment are removed from the following ones.
+
+:param serializer: Serializer instance
+:param part: Message part
+:param headers: List of header name and value tuples of the encapsulating
+                message
+:param partial_id: Partial message ID
+:param number: Fragment number
+:param total: Total number of fragments; None if not yet known
+
+:return: (bytes) Encoded header block
+:since:  v1.1.0
+        """
+
+        if (number > 1): headers = [ ( name, value ) for name, value in headers if (name.lower() not in PartialMessage.FIRST_FRAGMENT_HEADER_NAMES) ]
+
+        content_type = "message/partial; id=\"{0}\"; number={1:d}".format(partial_id, number)
+        if (total is not None): content_type += "; total={0:d}".format(total)
+
+        return serializer.get_header_chunk(part, headers + [ ( "MIME-Version", "1.0" ), ( "Content-Type", content_type ) ])
+    #
+
+    @staticmethod
+    def is_enclosed_header(name):
+        """
+Returns true if the header belongs to the header of the enclosed message.
+
+:param name: Header name
+
+:return: (bool) True if enclosed
+:since:  v1.1.0
+        """
+
+        name = name.lower()
+        return (name.startswith("content-") or name in PartialMessage.ENCLOSED_HEADER_NAMES)
+    #
+
+    @staticmethod
+    def iter_fragments(part, fragment_size, serializer, partial_id):
+        """
+Yields the given populated message part as "message/partial" fragments.
+Fragments are split at line endings where possible and do not exceed the
+given size including their header. The total number of fragments is given
+in the last fragment only while a "DKIM-Signature" is kept in the first one
+to be restored on reassembly.
+
+:param part: Populated message part
+:param fragment_size: Maximum size of each fragment in bytes
+:param serializer: Serializer instance
+:param partial_id: Partial message ID
+
+:since: v1.1.0
+        """
+
+        headers = [ ]
+        enclosed_headers = [ ]
+
+        for name, value in part.raw_items():
+            if (PartialMessage.is_enclosed_header(name)): enclosed_headers.append(( name, value ))
+            else: headers.append(( name, value ))
+        #
+
+        # Subject is used for the encapsulating messages as well
+        headers += [ ( name, value ) for name, value in enclosed_headers if (name.lower() == "subject") ]
+
+        linesep = serializer.linesep.encode("ascii")
+
+        chunks = chain([ serializer.get_header_chunk(part, enclosed_headers) ], serializer.iter_body_chunks(part))
+        data = b""
+        number = 1
+        position = 0
+
+        for chunk in chunks:
+            data = data[position:] + chunk
+            position = 0
+
+            while True:
+                header_chunk = PartialMessage._get_fragment_header_chunk(serializer, part, headers, partial_id, number)
+                data_size = PartialMessage._get_fragment_data_size(data, position, fragment_size - len(header_chunk), linesep)
+
+                # The last fragment is held back to add the total number
+                if (data_size >= len(data) - position): break
+
+                yield header_chunk + data[position:position + data_size]
+
+                number += 1
+                position += data_size
+            #
+        #
+
+        while True:
+            header_chunk = PartialMessage._get_fragment_header_chunk(serializer, part, headers, partial_id, number, number)
+            data_size = PartialMessage._get_fragment_data_size(data, position, fragment_size - len(header_chunk), linesep)
+
+            if (data_size >= len(data) - position):
+                yield header_chunk + data[position:]
+                break
+            #
+
+            yield PartialMessage._get_fragment_header_chunk(serializer, part, headers, partial_id, number) + data[position:position + data_size]
+
+            number += 1
+            position += data_size
+        #
+    #
+
+    @staticmethod
+    def _iter_header_fields(header_data, linesep):
+        """
+Yields the name and the raw data of each header field of the given header
+block. Folded fields are kept unchanged.
+
+:param header_data: Encoded header block without the blank line
+:param linesep: Encoded line separator
+
+:since: v1.1.0
+        """
+
+        name = None
+        lines = [ ]
+
+        for line in header_data.split(linesep):
+            if (line[:1] in ( b" ", b"\t" ) and name is not None): lines.append(line)
+            else:
+                if (name is not None): yield name, linesep.join(lines) + linesep
+
+                name = line.split(b":", 1)[0].strip().decode("ascii", "replace")
+                lines = [ line ]
+            #
+        #
+
+        if (name is not None): yield name, linesep.join(lines) + linesep
+    #
+
+    @staticmethod
+    def reassemble(fragments):
+        """
+Reassembles the original message of the given "message/partial" fragments
+as defined in RFC 2046, section 5.2.2.2. Fragments may be given in any
+order.
+
+:param fragments: Iterable of fragments as bytes
+
+:return: (bytes) Reassembled message
+:since:  v1.1.0
+        """
+
+        from email.parser import BytesHeaderParser
+        header_parser = BytesHeaderParser()
+
+        bodies = { }
+        first_header_data = None
+        linesep = b"\n"
+        partial_id = None
+        total = None
+
+        for fragment in fragments:
+            linesep = (b"\r\n" if (b"\r\n\r\n" in fragment) else b"\n")
+            header_data, body = fragment.split(linesep + linesep, 1)
+
+            header = header_parser.parsebytes(header_data + linesep + linesep)
+            if (header.get_content_type() != "message/partial"): raise ValueError("Given fragment is not a message/partial one")
+
+            if (partial_id is None): partial_id = header.get_param("id")
+            elif (partial_id != header.get_param("id")): raise ValueError("Given fragments belong to different messages")
+
+            number = int(header.get_param("number"))
+            if (header.get_param("total") is not None): total = int(header.get_param("total"))
+
+            bodies[number] = body
+            if (number == 1): first_header_data = header_data
+        #
+
+        if (total is None or sorted(bodies) != list(range(1, 1 + total))): raise ValueError("Given fragments are incomplete")
+
+        enclosed_data = b"".join(bodies[number] for number in range(1, 1 + total))
+        enclosed_header_data, enclosed_body = enclosed_data.split(linesep + linesep, 1)
+
+        _return = [ data
+                    for name, data in PartialMessage._iter_header_fields(first_header_data, linesep)
+                    if (not PartialMessage.is_enclosed_header(name))
+                  ]
+
+        _return += [ data
+                     for name, data in PartialMessage._iter_header_fields(enclosed_header_data, linesep)
+                     if (PartialMessage.is_enclosed_header(name))
+                   ]
+
+        _return.append(linesep)
+        _return.append(enclosed_body)
+
+        return b"".join(_return)
+    #
+#
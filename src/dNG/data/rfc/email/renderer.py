@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from collections import deque
+from os import cpu_count
+
+class Renderer(object):
+    """
+The renderer formats messages in bulk using a pool of worker processes.
+Results are returned in the order of the given messages as soon as they are
+available.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    def __init__(self, workers = None, batch_size = 8, linesep = "\n"):
+        """
+Constructor __init__(Renderer)
+
+:param workers: Number of worker processes (defaults to the number of CPUs)
+:param batch_size: Number of messages rendered per task
+:param linesep: Line separator to be used
+
+:since: v1.1.0
+        """
+
+        self.batch_size = batch_size
+        """
+Number of messages rendered per task
+        """
+        self._executor = None
+        """
+Executor instance
+        """
+        self.linesep = linesep
+        """
+Line separator used for the output
+        """
+        self.workers = (cpu_count() or 1) if (workers is None) else workers
+        """
+Number of workers
+        """
+    #
+
+    def __enter__(self):
+        """
+python.org: Enter the runtime context related to this object.
+
+:return: (object) Renderer instance
+:since:  v1.1.0
+        """
+
+        return self
+    #
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+python.org: Exit the runtime context related to this object.
+
+:return: (bool) True to suppress exceptions
+:since:  v1.1.0
+        """
+
+        self.shutdown()
+        return False
+    #
+
+    def _get_executor(self):
+        """
+Returns the executor instance used for rendering.
+
+:return: (object) Executor instance
+:since:  v1.1.0
+        """
+
+        if (self._executor is None): self._executor = self._new_executor()
+        return self._executor
+    #
+
+    def _new_executor(self):
+        """
+Returns a new executor instance.
+
+:return: (object) Executor instance
+:since:  v1.1.0
+        """
+
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers = self.workers)
+    #
+
+    def render(self, messages):
+        """
+Returns a generator yielding the formatted messages in the given order.
+Messages are read from the given iterable only as required to keep all
+workers busy.
+
+:param messages: Iterable of messages
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        executor = self._get_executor()
+        pending_futures = deque()
+        max_pending_futures = 2 * self.workers
+
+        batch = [ ]
+
+        for message in messages:
+            batch.append(message)
+
+            if (len(batch) >= self.batch_size):
+                pending_futures.append(executor.submit(Renderer.render_messages, batch, self.linesep))
+                batch = [ ]
+
+                while (len(pending_futures) >= max_pending_futures):
+                    for data in pending_futures.popleft().result(): yield data
+                #
+            #
+        #
+
+        if (len(batch) > 0): pending_futures.append(executor.submit(Renderer.render_messages, batch, self.linesep))
+
+        while (len(pending_futures) > 0):
+            for data in pending_futures.popleft().result(): yield data
+        #
+    #
+
+    def shutdown(self):
+        """
+Shuts down the workers.
+
+:since: v1.1.0
+        """
+
+        if (self._executor is not None):
+            self._executor.shutdown()
+            self._executor = None
+        #
+    #
+
+    @staticmethod
+    def render_messages(messages, linesep = "\n"):
+        """
+Renders the given messages.
+
+:param messages: List of messages
+:param linesep: Line separator to be used
+
+:return: (list) List of formatted messages as bytes
+:since:  v1.1.0
+        """
+
+        return [ b"".join(message.iter_chunks(linesep)) for message in messages ]
+    #
+#
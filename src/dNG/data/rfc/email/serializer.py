@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from random import randrange
+import re
+import sys
+
+from .spooled_buffer import SpooledBuffer
+
+class Serializer(object):
+    """
+The serializer writes a MIME part tree incrementally. Headers and payloads
+of each part are emitted as separate chunks instead of building the whole
+document in memory first.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    BOUNDARY_FORMAT = "===============%0{0:d}d==".format(len(repr(sys.maxsize - 1)))
+    """
+Format used for multipart boundaries (compatible to "email.generator")
+    """
+    RE_NEWLINE = re.compile(b"\r\n|\r|\n")
+    """
+RegExp to find line endings in payloads
+    """
+
+    def __init__(self, linesep = "\n", deterministic = False):
+        """
+Constructor __init__(Serializer)
+
+:param linesep: Line separator to be used
+:param deterministic: True to derive missing multipart boundaries from the
+                      content instead of a random number
+
+:since: v1.1.0
+        """
+
+        self.deterministic = deterministic
+        """
+True to derive missing multipart boundaries from the content
+        """
+        self.linesep = linesep
+        """
+Line separator used for the output
+        """
+        self._encoded_linesep = linesep.encode("ascii")
+        """
+Encoded line separator used for the output
+        """
+    #
+
+    def get_header_chunk(self, part, headers = None):
+        """
+Returns the encoded header block of the given part including the blank line
+separating it from the body.
+
+:param part: Message part
+:param headers: List of header name and value tuples to be used instead of
+                the ones of the part
+
+:return: (bytes) Encoded header block
+:since:  v1.1.0
+        """
+
+        if (part.is_multipart()): self._set_missing_boundary(part)
+        return self._get_header_chunk(part, self._get_policy(part), headers)
+    #
+
+    def _get_header_chunk(self, part, policy, headers = None):
+        """
+Returns the encoded header block of the given part including the blank line
+separating it from the body.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+:param headers: List of header name and value tuples to be used instead of
+                the ones of the part
+
+:return: (bytes) Encoded header block
+:since:  v1.1.0
+        """
+
+        if (headers is None): headers = part.raw_items()
+
+        _return = [ policy.fold_binary(name, value) for name, value in headers ]
+        _return.append(self._encoded_linesep)
+
+        return b"".join(_return)
+    #
+
+    def _get_policy(self, part):
+        """
+Returns the policy used to serialize the given part. Headers are not
+folded to be compatible with "email.message.Message.as_string()".
+
+:param part: Message part
+
+:return: (object) Policy instance
+:since:  v1.1.0
+        """
+
+        return part.policy.clone(linesep = self.linesep, max_line_length = 0)
+    #
+
+    def _get_multipart_size(self, part, policy):
+        """
+Returns the size of the body of the given multipart part.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        boundary_size = 2 + len(part.get_boundary())
+        linesep_size = len(self._encoded_linesep)
+
+        _return = 0
+        if (part.preamble is not None): _return += self.get_normalized_size(part.preamble) + linesep_size
+
+        sub_parts = part.get_payload()
+
+        for sub_part in sub_parts: _return += boundary_size + linesep_size + self._get_part_size(sub_part, policy)
+        _return += linesep_size * max(0, len(sub_parts) - 1)
+
+        if (len(sub_parts) < 1): _return += boundary_size + linesep_size
+        _return += linesep_size + boundary_size + 2 + linesep_size
+
+        if (part.epilogue is not None): _return += self.get_normalized_size(part.epilogue)
+
+        return _return
+    #
+
+    def get_normalized_size(self, data):
+        """
+Returns the size of the given data with all line endings replaced by the
+configured line separator.
+
+:param data: Data to normalize
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        if (not isinstance(data, bytes)): data = data.encode("ascii", "surrogateescape")
+
+        if (self._encoded_linesep == b"\n" and b"\r" not in data): _return = len(data)
+        else:
+            crlf_count = data.count(b"\r\n")
+            line_endings = data.count(b"\r") + data.count(b"\n") - crlf_count
+
+            _return = len(data) - line_endings - crlf_count + line_endings * len(self._encoded_linesep)
+        #
+
+        return _return
+    #
+
+    def _get_part_size(self, part, policy):
+        """
+Returns the size of the given part and all of its sub parts.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        is_multipart = part.is_multipart()
+        if (is_multipart): self._set_missing_boundary(part)
+
+        _return = len(self._get_header_chunk(part, policy))
+
+        frozen_bodies = getattr(part, "frozen_bodies", None)
+        frozen_body = (None if (frozen_bodies is None) else frozen_bodies.get(self.linesep))
+
+        if (frozen_body is not None): _return += len(frozen_body)
+        elif (is_multipart): _return += self._get_multipart_size(part, policy)
+        elif (hasattr(part, "encoded_size")): _return += part.encoded_size(self.linesep)
+        else:
+            payload = part.get_payload()
+            if (payload): _return += self.get_normalized_size(payload)
+        #
+
+        return _return
+    #
+
+    def get_size(self, part):
+        """
+Returns the exact size of the serialized part tree without serializing
+payloads. Missing multipart boundaries are set as they would be on
+serialization.
+
+:param part: Message part
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        return self._get_part_size(part, self._get_policy(part))
+    #
+
+    def iter_chunks(self, part):
+        """
+Returns a generator yielding the serialized part tree as encoded chunks.
+
+:param part: Message part
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        return self._iter_part_chunks(part, self._get_policy(part))
+    #
+
+    def iter_body_chunks(self, part):
+        """
+Returns a generator yielding the serialized body of the given part without
+its header block.
+
+:param part: Message part
+
+:return: (object) Generator yielding bytes
+:since:  v1.1.0
+        """
+
+        return self._iter_body_chunks(part, self._get_policy(part))
+    #
+
+    def _iter_body_chunks(self, part, policy):
+        """
+Yields the body of the given part.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+
+:since: v1.1.0
+        """
+
+        if (part.is_multipart()):
+            for chunk in self._iter_multipart_chunks(part, policy): yield chunk
+        else:
+            payload_chunks = (part.iter_encoded_payload()
+                              if (hasattr(part, "iter_encoded_payload")) else
+                              [ part.get_payload() ]
+                             )
+
+            for chunk in payload_chunks:
+                if (chunk): yield self._normalize_lines(chunk)
+            #
+        #
+    #
+
+    def _iter_multipart_chunks(self, part, policy):
+        """
+Yields the body of the given multipart part.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+
+:since: v1.1.0
+        """
+
+        boundary = part.get_boundary().encode("ascii")
+        linesep = self._encoded_linesep
+
+        if (part.preamble is not None): yield self._normalize_lines(part.preamble) + linesep
+
+        is_first_part = True
+
+        for sub_part in part.get_payload():
+            yield (b"--" if (is_first_part) else linesep + b"--") + boundary + linesep
+            is_first_part = False
+
+            for chunk in self._iter_part_chunks(sub_part, policy): yield chunk
+        #
+
+        if (is_first_part): yield b"--" + boundary + linesep
+        yield linesep + b"--" + boundary + b"--" + linesep
+
+        if (part.epilogue is not None): yield self._normalize_lines(part.epilogue)
+    #
+
+    def _iter_part_chunks(self, part, policy):
+        """
+Yields the given part and all of its sub parts.
+
+:param part: Message part
+:param policy: Policy used to fold headers
+
+:since: v1.1.0
+        """
+
+        if (part.is_multipart()): self._set_missing_boundary(part)
+        yield self._get_header_chunk(part, policy)
+
+        frozen_bodies = getattr(part, "frozen_bodies", None)
+
+        if (frozen_bodies is None):
+            for chunk in self._iter_body_chunks(part, policy): yield chunk
+        else:
+            frozen_body = frozen_bodies.get(self.linesep)
+
+            if (frozen_body is None):
+                frozen_body = SpooledBuffer.join(self._iter_body_chunks(part, policy))
+                frozen_bodies[self.linesep] = frozen_body
+            #
+
+            if (isinstance(frozen_body, SpooledBuffer)):
+                for chunk in frozen_body.iter_blocks(): yield chunk
+            else: yield frozen_body
+        #
+    #
+
+    def _normalize_lines(self, data):
+        """
+Returns the given data encoded with all line endings replaced by the
+configured line separator.
+
+:param data: Data to normalize
+
+:return: (bytes) Normalized data
+:since:  v1.1.0
+        """
+
+        if (not isinstance(data, bytes)): data = data.encode("ascii", "surrogateescape")
+
+        return (data
+                if (self._encoded_linesep == b"\n" and b"\r" not in data) else
+                Serializer.RE_NEWLINE.sub(self._encoded_linesep, data)
+               )
+    #
+
+    def set_missing_boundaries(self, part):
+        """
+Sets new multipart boundaries for the given part and all of its sub parts
+where missing. Part trees prepared this way are not modified on
+serialization.
+
+:param part: Message part
+
+:since: v1.1.0
+        """
+
+        for sub_part in part.walk():
+            if (sub_part.is_multipart()): self._set_missing_boundary(sub_part)
+        #
+    #
+
+    def _set_missing_boundary(self, part):
+        """
+Sets a new multipart boundary for the given part if it is missing.
+
+:param part: Multipart message part
+
+:since: v1.1.0
+        """
+
+        if (not part.get_boundary()):
+            part.set_boundary(Serializer.get_content_boundary(part) if (self.deterministic) else Serializer.get_boundary())
+        #
+    #
+
+    def write(self, part, fp):
+        """
+Writes the serialized part tree to the given binary file-like object.
+
+:param part: Message part
+:param fp: Binary file-like object
+
+:since: v1.1.0
+        """
+
+        for chunk in self.iter_chunks(part): fp.write(chunk)
+    #
+
+    @staticmethod
+    def get_content_boundary(part):
+        """
+Returns a multipart boundary derived from the headers and content of the
+given part and all of its sub parts.
+
+:param part: Message part
+
+:return: (str) Multipart boundary
+:since:  v1.1.0
+        """
+
+        return Serializer.BOUNDARY_FORMAT % (int.from_bytes(Serializer.get_content_digest(part)[:8], "big") % sys.maxsize)
+    #
+
+    @staticmethod
+    def get_content_digest(part):
+        """
+Returns a SHA-256 digest of the headers and content of the given part and
+all of its sub parts. The content of sources that can only be read once is
+not included.
+
+:param part: Message part
+
+:return: (bytes) Content digest
+:since:  v1.1.0
+        """
+
+        from hashlib import sha256
+
+        content_digest = sha256()
+
+        for name, value in part.raw_items():
+            content_digest.update("{0}: {1}\n".format(name, value).encode("utf-8", "surrogateescape"))
+        #
+
+        content_digest.update(b"\n")
+
+        if (part.is_multipart()):
+            for sub_part in part.get_payload(): content_digest.update(Serializer.get_content_digest(sub_part))
+        elif (hasattr(part, "is_single_use_source")):
+            # Sources that can only be read once are identified by their
+            # headers only as reading them would consume them.
+            if (not part.is_single_use_source): content_digest.update(part.content_digest)
+        else:
+            payload = part.get_payload()
+            if (payload is not None): content_digest.update(str(payload).encode("utf-8", "surrogateescape"))
+        #
+
+        return content_digest.digest()
+    #
+
+    @staticmethod
+    def get_boundary():
+        """
+Returns a new random multipart boundary.
+
+:return: (str) Multipart boundary
+:since:  v1.1.0
+        """
+
+        return Serializer.BOUNDARY_FORMAT % randrange(sys.maxsize)
+    #
+#
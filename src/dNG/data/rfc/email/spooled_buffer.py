@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from threading import Lock
+
+class SpooledBuffer(object):
+    """
+The spooled buffer holds data in memory until its size exceeds the
+configured threshold and in a temporary file afterwards. Payloads and
+formatted messages larger than the threshold are therefore not kept in
+memory while waiting to be sent. Blocks are read at the position requested
+so that a buffer may be read by several threads at the same time.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    BLOCK_SIZE = 65536
+    """
+Size of blocks read from the buffer
+    """
+
+    _threshold = None
+    """
+Process wide size in bytes data is spooled to disk above; None to keep all
+data in memory
+    """
+
+    def __init__(self, threshold = None):
+        """
+Constructor __init__(SpooledBuffer)
+
+:param threshold: Size in bytes data is spooled to disk above (defaults to
+                  the process wide threshold)
+
+:since: v1.1.0
+        """
+
+        from tempfile import SpooledTemporaryFile
+
+        if (threshold is None): threshold = SpooledBuffer._threshold
+
+        self._file = SpooledTemporaryFile(max_size = (0 if (threshold is None) else threshold))
+        """
+Spooled temporary file
+        """
+        self._lock = Lock()
+        """
+Thread safety lock
+        """
+        self._size = 0
+        """
+Size of the buffered data in bytes
+        """
+        self.threshold = threshold
+        """
+Size in bytes data is spooled to disk above
+        """
+
+        # "SpooledTemporaryFile" keeps data in memory if "max_size" is 0
+        if (threshold is not None and threshold < 1): self._file.rollover()
+    #
+
+    def __getstate__(self):
+        """
+python.org: Classes can further influence how their instances are pickled.
+
+:return: (dict) State to be pickled
+:since:  v1.1.0
+        """
+
+        return { "data": self.getvalue(), "threshold": self.threshold }
+    #
+
+    def __len__(self):
+        """
+python.org: Called to implement the built-in function len().
+
+:return: (int) Size of the buffered data in bytes
+:since:  v1.1.0
+        """
+
+        return self._size
+    #
+
+    def __setstate__(self, state):
+        """
+python.org: Upon unpickling, the state is passed to this method.
+
+:param state: Unpickled state
+
+:since: v1.1.0
+        """
+
+        self.__init__(state['threshold'])
+        self.write(state['data'])
+    #
+
+    @property
+    def disk_size(self):
+        """
+Returns the size of the data held on disk.
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        return (self._size if (self.is_on_disk) else 0)
+    #
+
+    @property
+    def is_on_disk(self):
+        """
+Returns true if the data has been spooled to disk.
+
+:return: (bool) True if held in a temporary file
+:since:  v1.1.0
+        """
+
+        return (self.threshold is not None and (self.threshold < 1 or self._size > self.threshold))
+    #
+
+    @property
+    def memory_size(self):
+        """
+Returns the size of the data held in memory.
+
+:return: (int) Size in bytes
+:since:  v1.1.0
+        """
+
+        return (0 if (self.is_on_disk) else self._size)
+    #
+
+    def close(self):
+        """
+Closes the buffer and removes the temporary file.
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._file.close()
+            self._size = 0
+        #
+    #
+
+    def getvalue(self):
+        """
+Returns the buffered data.
+
+:return: (bytes) Buffered data
+:since:  v1.1.0
+        """
+
+        with self._lock:
+            self._file.seek(0)
+            _return = self._file.read()
+        #
+
+        return _return
+    #
+
+    def iter_blocks(self):
+        """
+Yields the buffered data in blocks. A "\\r" at the end of a block is
+moved to the next one to not split line endings.
+
+:since: v1.1.0
+        """
+
+        position = 0
+        remainder = b""
+
+        while True:
+            with self._lock:
+                self._file.seek(position)
+                data = self._file.read(SpooledBuffer.BLOCK_SIZE)
+            #
+
+            if (not data): break
+            position += len(data)
+
+            if (remainder): data = remainder + data
+            remainder = b""
+
+            if (data[-1:] == b"\r"):
+                remainder = data[-1:]
+                data = data[:-1]
+            #
+
+            if (data): yield data
+        #
+
+        if (remainder): yield remainder
+    #
+
+    def write(self, data):
+        """
+Appends the given data to the buffer.
+
+:param data: Data to be appended
+
+:since: v1.1.0
+        """
+
+        with self._lock:
+            self._file.seek(0, 2)
+            self._file.write(data)
+            self._size += len(data)
+        #
+    #
+
+    @staticmethod
+    def get_storage_sizes(data):
+        """
+Returns the number of bytes of the given bytes or spooled buffer held in
+memory and on disk.
+
+:param data: Bytes, spooled buffer or None
+
+:return: (tuple) Size in memory and size on disk in bytes
+:since:  v1.1.0
+        """
+
+        if (data is None): _return = ( 0, 0 )
+        elif (isinstance(data, SpooledBuffer)): _return = ( data.memory_size, data.disk_size )
+        else: _return = ( len(data), 0 )
+
+        return _return
+    #
+
+    @staticmethod
+    def get_threshold():
+        """
+Returns the process wide size data is spooled to disk above.
+
+:return: (int) Size in bytes; None if all data is kept in memory
+:since:  v1.1.0
+        """
+
+        return SpooledBuffer._threshold
+    #
+
+    @staticmethod
+    def join(chunks):
+        """
+Returns the given chunks joined. The data is spooled if its size exceeds
+the process wide threshold.
+
+:param chunks: Iterable of bytes
+
+:return: (object) Bytes or spooled buffer if the data is held on disk
+:since:  v1.1.0
+        """
+
+        if (SpooledBuffer._threshold is None): _return = b"".join(chunks)
+        else:
+            _return = SpooledBuffer()
+            for chunk in chunks: _return.write(chunk)
+
+            if (not _return.is_on_disk):
+                buffer = _return
+                _return = buffer.getvalue()
+
+                buffer.close()
+            #
+        #
+
+        return _return
+    #
+
+    @staticmethod
+    def set_threshold(threshold):
+        """
+Sets the process wide size data is spooled to disk above. Encoded payloads
+of new parts, frozen bodies and formatted messages kept for reuse larger
+than the threshold are held in temporary files.
+
+:param threshold: Size in bytes; None to keep all data in memory
+
+:since: v1.1.0
+        """
+
+        if (threshold is not None):
+            if (type(threshold) is not int): raise TypeError("Given threshold type is not supported")
+            if (threshold < 0): raise ValueError("Threshold must not be negative")
+        #
+
+        SpooledBuffer._threshold = threshold
+    #
+#
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from os import cpu_count
+
+from .renderer import Renderer
+
+class ThreadRenderer(Renderer):
+    """
+The thread renderer formats messages using a pool of threads. Messages are
+not pickled and may be shared with other threads, e.g. of senders spending
+most of their time waiting for I/O.
+
+:author:    direct Netware Group
+:copyright: (C) direct Netware Group - All rights reserved
+:package:   rfc_email.py
+:since:     v1.1.0
+:license:   https://www.direct-netware.de/redirect?licenses;mpl2
+            Mozilla Public License, v. 2.0
+    """
+
+    def __init__(self, workers = None, batch_size = 1, linesep = "\n"):
+        """
+Constructor __init__(ThreadRenderer)
+
+:param workers: Number of worker threads (defaults to the number of CPUs
+                plus 4 and at most 32)
+:param batch_size: Number of messages rendered per task
+:param linesep: Line separator to be used
+
+:since: v1.1.0
+        """
+
+        if (workers is None): workers = min(32, (cpu_count() or 1) + 4)
+        Renderer.__init__(self, workers, batch_size, linesep)
+    #
+
+    def _new_executor(self):
+        """
+Returns a new executor instance.
+
+:return: (object) Executor instance
+:since:  v1.1.0
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers = self.workers)
+    #
+#
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email.utils import parseaddr
+import unittest
+
+from dNG.data.rfc.email.address_validator import AddressValidator
+
+class TestRfcEMailAddressValidator(unittest.TestCase):
+    def test_parseaddr_compatibility(self):
+        """
+Test that results are identical to the "email.utils.parseaddr()" check.
+        """
+
+        addresses = [ "user@localhost",
+                      "first.last+tag@example.com",
+                      "Jörg Müller <joerg@localhost>",
+                      "\"Doe, John\" <john@localhost>",
+                      "user@",
+                      "@localhost",
+                      "<>",
+                      "",
+                      " ",
+                      "a@b..c",
+                      "user@localhost, other@localhost"
+                    ]
+
+        for address in addresses:
+            self.assertEqual(parseaddr(address)[1] != "", AddressValidator.is_valid(address), address)
+        #
+    #
+
+    def test_validate_many(self):
+        """
+Test validating addresses in bulk.
+        """
+
+        errors = AddressValidator.validate_many([ "user@localhost", "", "Joe <joe@localhost>", "<>" ])
+
+        self.assertEqual([ "", "<>" ], list(errors.keys()))
+        self.assertTrue(isinstance(errors[''], TypeError))
+
+        self.assertEqual({ }, AddressValidator.validate_many([ "user@localhost" ]))
+        self.assertRaises(TypeError, AddressValidator.validate, "")
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
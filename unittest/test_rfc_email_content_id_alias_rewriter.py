@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+import unittest
+
+from dNG.data.rfc.email.content_id_alias_rewriter import ContentIdAliasRewriter
+
+class TestRfcEMailContentIdAliasRewriter(unittest.TestCase):
+    def test_rewrite(self):
+        """
+Test that only whole Content-IDs are rewritten.
+        """
+
+        rewriter = ContentIdAliasRewriter({ "logo1": "a", "b": "a" })
+
+        self.assertEqual(( b"<img src='cid:a' /><img src=cid:logo10><img src=\"cid:a\">cid:a", 3 ),
+                         rewriter.rewrite(b"<img src='cid:logo1' /><img src=cid:logo10><img src=\"cid:b\">cid:b")
+                        )
+
+        self.assertEqual(( b"cid:logo1", 0 ), ContentIdAliasRewriter({ }).rewrite(b"cid:logo1"))
+    #
+
+    def test_iter_rewritten(self):
+        """
+Test rewriting references split across chunks.
+        """
+
+        rewriter = ContentIdAliasRewriter({ "logo1": "a" })
+        data = b"<img src='cid:logo1' /><img src='cid:logo10' />cid:logo1"
+
+        for chunk_size in range(1, len(data) + 1):
+            chunks = [ data[position:position + chunk_size] for position in range(0, len(data), chunk_size) ]
+
+            self.assertEqual(b"<img src='cid:a' /><img src='cid:logo10' />cid:a",
+                             b"".join(rewriter.iter_rewritten(chunks))
+                            )
+        #
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
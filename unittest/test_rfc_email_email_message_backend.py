@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email import message_from_bytes, policy
+import pickle
+import unittest
+
+from dNG.data.rfc.email.message import Message
+from dNG.data.rfc.email.part import Part
+
+class TestRfcEMailEmailMessageBackend(unittest.TestCase):
+    def _get_message(self):
+        """
+Returns a message with non-ASCII headers, alternative bodies, a related
+part and attachments.
+
+:return: (object) Message instance
+        """
+
+        _return = Message()
+        _return.sender = "Jörg Müller <joerg@example.com>"
+        _return.subject = "Schöne Grüße"
+        _return.add_to("recipient@example.org")
+        _return.add_cc("Zoe <cc@example.org>")
+        _return.set_header("Date", "Sun, 18 Oct 2026 12:00:00 +0000")
+
+        _return.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hallo Welt, schön das du dich drehst.\n" * 10))
+        _return.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<p>Hallo Welt</p><img src='cid:logo' />"))
+        _return.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG\x00" * 100, file_name = "logo.png", content_id = "logo"))
+        _return.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Anhang ä", file_name = "anhang.txt"))
+        _return.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", bytes(bytearray(range(0, 256))), file_name = "data.bin"))
+
+        return _return
+    #
+
+    def _get_parsed_structure(self, data):
+        """
+Returns the content relevant structure of the given formatted message.
+
+:param data: Formatted message
+
+:return: (list) List of header values and tuples of the MIME type, the
+         Content-Disposition, the file name, the Content-ID and the
+         content of each part
+        """
+
+        parsed_message = message_from_bytes(data, policy = policy.default)
+
+        _return = [ str(parsed_message[name]) for name in ( "From", "To", "Cc", "Subject", "Date" ) ]
+
+        for part in parsed_message.walk():
+            content = (None if (part.is_multipart()) else part.get_content())
+            if (isinstance(content, str)): content = content.replace("\r\n", "\n").rstrip("\n")
+
+            _return.append(( part.get_content_type(), part.get_content_disposition(), part.get_filename(), part['Content-ID'], content ))
+        #
+
+        return _return
+    #
+
+    def test_parity(self):
+        """
+Test that both backends produce messages of identical content.
+        """
+
+        message = self._get_message()
+        compat32_data = message.as_bytes()
+
+        message.policy = policy.SMTP
+        data = message.as_bytes("\r\n")
+
+        self.assertTrue(data.split(b"\r\n\r\n", 1)[0].isascii())
+        self.assertEqual(self._get_parsed_structure(compat32_data), self._get_parsed_structure(data))
+        self.assertEqual(len(data), message.estimated_size("\r\n"))
+
+        message = pickle.loads(pickle.dumps(message))
+        self.assertEqual(self._get_parsed_structure(compat32_data), self._get_parsed_structure(message.as_bytes()))
+    #
+
+    def test_smtputf8(self):
+        """
+Test SMTPUTF8 output with unencoded headers and 8bit text parts.
+        """
+
+        message = self._get_message()
+        message.deterministic = True
+
+        compat32_data = message.as_bytes()
+
+        message.policy = policy.SMTPUTF8
+        data = message.as_bytes()
+
+        self.assertTrue(policy.SMTPUTF8 is message.policy)
+        self.assertIn("Subject: Schöne Grüße\n".encode("utf-8"), data)
+        self.assertIn("From: Jörg Müller <joerg@example.com>\n".encode("utf-8"), data)
+        self.assertNotIn(b"=?utf-8?", data)
+        self.assertIn(b"Content-Transfer-Encoding: 8bit\n", data)
+        self.assertEqual(self._get_parsed_structure(compat32_data), self._get_parsed_structure(data))
+
+        self.assertRaises(ValueError, lambda: list(message.iter_partial_messages(1024)))
+
+        message.policy = None
+        self.assertEqual(compat32_data, message.as_bytes())
+    #
+
+    def test_undecodable_text(self):
+        """
+Test that text parts not matching their charset are converted as binary
+ones and that only the root part has a "MIME-Version" header.
+        """
+
+        message = self._get_message()
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", b"\xff\xfe bin", file_name = "bin.txt"))
+        message.policy = policy.SMTPUTF8
+
+        data = message.as_bytes()
+        parsed_message = message_from_bytes(data, policy = policy.default)
+
+        self.assertEqual(b"\xff\xfe bin", list(parsed_message.walk())[-1].get_payload(decode = True))
+        self.assertEqual(1, data.count(b"MIME-Version: "))
+    #
+
+    def test_unsupported_policy(self):
+        """
+Test that only "email.policy.EmailPolicy" instances are accepted.
+        """
+
+        message = self._get_message()
+
+        with self.assertRaises(TypeError): message.policy = policy.compat32
+        self.assertIsNone(message.policy)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
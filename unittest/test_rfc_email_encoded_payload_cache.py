@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from base64 import b64encode
+import unittest
+
+from dNG.data.rfc.email.encoded_payload_cache import EncodedPayloadCache
+from dNG.data.rfc.email.part import Part
+
+class TestRfcEMailEncodedPayloadCache(unittest.TestCase):
+    def test_eviction(self):
+        """
+Test the least recently used eviction of the cache.
+        """
+
+        cache = EncodedPayloadCache(max_size = 16)
+
+        self.assertEqual(b"YWFh", cache.get_encoded(b"aaa", "base64", b64encode))
+        self.assertEqual(b"YmJi", cache.get_encoded(b"bbb", "base64", b64encode))
+        self.assertEqual(b"Y2Nj", cache.get_encoded(b"ccc", "base64", b64encode))
+        self.assertEqual(b"YWFh", cache.get_encoded(b"aaa", "base64", b64encode))
+        self.assertEqual(12, cache.size)
+
+        self.assertEqual(b"ZGRkZA==", cache.get_encoded(b"dddd", "base64", b64encode))
+        self.assertEqual(3, len(cache))
+        self.assertEqual({ "hits": 1, "misses": 4, "evictions": 1, "entries": 3, "size": 16 }, cache.statistics)
+
+        cache.get_encoded(b"bbb", "base64", b64encode)
+        self.assertEqual(5, cache.statistics['misses'])
+
+        cache.max_size = 0
+        self.assertEqual(0, len(cache))
+    #
+
+    def test_part_payload_sharing(self):
+        """
+Test that identical attachments are encoded only once.
+        """
+
+        cache = EncodedPayloadCache.get_instance()
+        cache.clear()
+
+        data = b"\x89PNG\x00" * 1024
+
+        part = Part(Part.TYPE_BINARY_ATTACHMENT, "image/png", data, file_name = "logo.png")
+        part_copy = Part(Part.TYPE_BINARY_INLINE, "image/png", data, file_name = "logo.png")
+
+        self.assertTrue(list(part.iter_encoded_payload())[0] is list(part_copy.iter_encoded_payload())[0])
+        self.assertEqual(1, cache.statistics['hits'])
+        self.assertEqual(1, cache.statistics['misses'])
+
+        Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world")
+        self.assertEqual(1, cache.statistics['misses'])
+    #
+
+    def test_part_payload_without_encoding(self):
+        """
+Test that attachments sent as is bypass the cache.
+        """
+
+        cache = EncodedPayloadCache.get_instance()
+        cache.clear()
+
+        statistics = cache.statistics
+
+        for transfer_encoding in ( "7bit", "8bit" ):
+            data = ("Hello world" if (transfer_encoding == "7bit") else "Grüße").encode("utf-8")
+
+            part = Part(Part.TYPE_ATTACHMENT, "text/plain", data, file_name = "hello.txt", transfer_encoding = transfer_encoding)
+            self.assertTrue(list(part.iter_encoded_payload())[0] is data)
+        #
+
+        self.assertEqual(statistics, cache.statistics)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from base64 import encodebytes
+from quopri import decodestring, encodestring
+import unittest
+
+from dNG.data.rfc.email.encoder import Encoder
+
+class TestRfcEMailEncoder(unittest.TestCase):
+    def test_base64(self):
+        """
+Test base64 encoding of data given in blocks of any size.
+        """
+
+        data = bytes(bytearray(range(0, 256))) * 1000
+        encoded_data = encodebytes(data)[:-1]
+
+        self.assertEqual(encoded_data, Encoder.encode_base64(data))
+        self.assertEqual(encoded_data, Encoder.encode_base64(bytearray(data)))
+        self.assertEqual(76, max(len(line) for line in Encoder.encode_base64(data).split(b"\n")))
+
+        blocks = [ data[position:position + 1000] for position in range(0, len(data), 1000) ]
+        self.assertEqual(encoded_data, b"".join(Encoder.iter_base64(blocks)))
+
+        blocks = [ data[:1], data[1:100], data[100:] ]
+        self.assertEqual(encoded_data, b"".join(Encoder.iter_base64(blocks)))
+
+        self.assertEqual(b"", Encoder.encode_base64(b""))
+        self.assertEqual(b"YQ==", Encoder.encode_base64(b"a"))
+    #
+
+    def test_quoted_printable(self):
+        """
+Test quoted-printable encoding of data given in blocks of any size.
+        """
+
+        data = ("Hallo Welt, schön das du dich drehst. \n" * 4096).encode("utf-8")
+        encoded_data = encodestring(data)
+
+        self.assertEqual(encoded_data, Encoder.encode_quoted_printable(data))
+
+        blocks = [ data[position:position + 777] for position in range(0, len(data), 777) ]
+        self.assertEqual(encoded_data, b"".join(Encoder.iter_quoted_printable(blocks)))
+
+        data = b"x" * (Encoder.QUOTED_PRINTABLE_CHUNK_SIZE + 1000)
+        encoded_lines = Encoder.encode_quoted_printable(data).split(b"\n")
+
+        self.assertTrue(max(len(line) for line in encoded_lines) <= 76)
+        self.assertEqual(data, b"".join(line.rstrip(b"=") for line in encoded_lines))
+
+        # Trailing whitespace encoded at the wrap column
+        for data in ( ("x" * 75 + " \n") * 3, "x" * 74 + "ö \n", "x" * 200 + "\t" ):
+            data = data.encode("utf-8")
+            encoded_data = Encoder.encode_quoted_printable(data)
+
+            self.assertTrue(max(len(line) for line in encoded_data.split(b"\n")) <= 76)
+            self.assertEqual(data, decodestring(encoded_data))
+        #
+
+        data = b"x" * (Encoder.QUOTED_PRINTABLE_CHUNK_SIZE - 1) + b" " + b"y" * 100
+        encoded_data = Encoder.encode_quoted_printable(data)
+
+        self.assertTrue(max(len(line) for line in encoded_data.split(b"\n")) <= 76)
+        self.assertEqual(data, decodestring(encoded_data))
+    #
+
+    def test_transfer_encodings(self):
+        """
+Test the selection of the encoding by Content-Transfer-Encoding name.
+        """
+
+        self.assertEqual(b"Hello world", Encoder.encode(b"Hello world", "7bit"))
+        self.assertEqual(b"SGVsbG8gd29ybGQ=", Encoder.encode(b"Hello world", "base64"))
+        self.assertEqual(b"Sch=C3=B6n", Encoder.encode("Schön".encode("utf-8"), "quoted-printable"))
+        self.assertRaises(ValueError, Encoder.encode, b"Hello world", "binary")
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
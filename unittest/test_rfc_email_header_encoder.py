@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email import message_from_string
+from email.header import decode_header, make_header
+import unittest
+
+from dNG.data.rfc.email.header_encoder import HeaderEncoder
+from dNG.data.rfc.email.message import Message
+from dNG.data.rfc.email.part import Part
+
+class TestRfcEMailHeaderEncoder(unittest.TestCase):
+    def test_encode(self):
+        """
+Test encoding and folding of header values.
+        """
+
+        self.assertEqual("Test message", HeaderEncoder.encode_subject("Test message"))
+        self.assertEqual("=?utf-8?q?Test=2E_message?=", HeaderEncoder.encode_subject("Test. message"))
+        self.assertEqual("Version 1.0", HeaderEncoder.encode("X-Mailer", "Version 1.0"))
+
+        subject = "We like German Umlauts to test UTF-8 öäü. " * 4
+        encoded_subject = HeaderEncoder.encode_subject(subject)
+
+        self.assertTrue(encoded_subject is HeaderEncoder.encode_subject(subject))
+        self.assertTrue(max(len(line) for line in ("Subject: " + encoded_subject).split("\n")) <= 78)
+        self.assertEqual(subject, str(make_header(decode_header(encoded_subject))))
+    #
+
+    def test_message_headers(self):
+        """
+Test the encoded headers of a message.
+        """
+
+        subject = "We like German Umlauts to test UTF-8 öäü. " * 4
+
+        message = Message()
+        message.sender = "Jörg Müller <sender@localhost>"
+        message.reply_to = "reply@localhost"
+        message.subject = subject
+        message.set_header("X-Comment", "Grüße")
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+
+        data = message.as_string()
+        parsed_message = message_from_string(data)
+
+        self.assertEqual("=?utf-8?b?SsO2cmcgTcO8bGxlcg==?= <sender@localhost>", parsed_message['From'])
+        self.assertEqual("reply@localhost", parsed_message['Reply-To'])
+        self.assertEqual(subject.strip(), str(make_header(decode_header(parsed_message['Subject']))))
+        self.assertEqual("Grüße", str(make_header(decode_header(parsed_message['X-Comment']))))
+        self.assertTrue(max(len(line) for line in data.split("\n")) <= 78)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+import unittest
+
+from dNG.data.rfc.email.instrumentation import Instrumentation
+from dNG.data.rfc.email.message import Message
+from dNG.data.rfc.email.part import Part
+
+class TestRfcEMailInstrumentation(unittest.TestCase):
+    def tearDown(self):
+        """
+Disables instrumentation after each test.
+        """
+
+        Instrumentation.set_callback(None)
+    #
+
+    def test_render_phases(self):
+        """
+Test the collected phase statistics of a render.
+        """
+
+        instrumentation = Instrumentation()
+        Instrumentation.set_callback(instrumentation)
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", b"\x00" * 3000, file_name = "test.bin"))
+
+        data = message.as_string()
+
+        self.assertEqual(2, instrumentation.totals[Instrumentation.PHASE_ENCODE]['calls'])
+        self.assertEqual(1, len(instrumentation.renders))
+
+        render_statistics = list(instrumentation.renders.values())[0]
+
+        self.assertEqual(set([ Instrumentation.PHASE_ASSEMBLE, Instrumentation.PHASE_HEADERS, Instrumentation.PHASE_SERIALIZE ]),
+                         set(render_statistics.keys())
+                        )
+
+        self.assertEqual(len(data), render_statistics[Instrumentation.PHASE_SERIALIZE]['bytes'])
+    #
+
+    def test_disabled(self):
+        """
+Test that nothing is collected without a callback.
+        """
+
+        instrumentation = Instrumentation()
+        Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world")
+
+        self.assertEqual(None, Instrumentation.get_callback())
+        self.assertEqual({ }, instrumentation.totals)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
@@ -17,11 +17,22 @@ https://www.direct-netware.de/redirect?licenses;mpl2
 #echo(__FILEPATH__)#
 """
 
+from email import message_from_bytes
+from io import BytesIO
+from threading import Thread
+import os
+import pickle
 import re
+import subprocess
+import sys
+import tracemalloc
 import unittest
 
 from dNG.data.rfc.email.message import Message
 from dNG.data.rfc.email.part import Part
+from dNG.data.rfc.email.partial_message import PartialMessage
+from dNG.data.rfc.email.spooled_buffer import SpooledBuffer
+from dNG.data.rfc.email.thread_renderer import ThreadRenderer
 
 class TestRfcEMailPart(unittest.TestCase):
     def test_plain(self):
@@ -154,6 +165,529 @@ Hello world 2
                         )
     #
 
+    def test_attachment_deduplication(self):
+        """
+Test deduplication of attachments and related parts of identical content.
+        """
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<img src='cid:logo1' /><img src='cid:logo2' />"))
+
+        for content_id in ( "logo1", "logo2" ):
+            message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = content_id))
+        #
+
+        message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/gif", b"\x89PNG", file_name = "logo.gif", content_id = "logo3"))
+
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt"))
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt"))
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "copy.txt"))
+
+        self.assertEqual(2, len(message.body_related_list))
+        self.assertEqual(2, len(message.attachment_list))
+
+        parsed_message = message_from_bytes(message.as_bytes())
+        related_message = parsed_message.get_payload(0)
+
+        self.assertEqual(3, len(related_message.get_payload()))
+        self.assertEqual(b"<img src='cid:logo1' /><img src='cid:logo1' />", related_message.get_payload(0).get_payload(decode = True))
+        self.assertEqual("<logo1>", related_message.get_payload(1)['Content-ID'])
+        self.assertEqual(3, len(parsed_message.get_payload()))
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<img src='cid:logo1' /><img src=cid:logo10><img src=\"cid:b\">cid:b"))
+
+        message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = "a"))
+        message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = "logo1"))
+        message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG\x00", file_name = "logo.png", content_id = "logo10"))
+        message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = "b"))
+
+        related_message = message_from_bytes(message.as_bytes())
+
+        self.assertEqual(3, len(related_message.get_payload()))
+        self.assertEqual(b"<img src='cid:a' /><img src=cid:logo10><img src=\"cid:a\">cid:a", related_message.get_payload(0).get_payload(decode = True))
+    #
+
+    def test_iterable_body_aliases(self):
+        """
+Test that Content-ID aliases are rewritten in iterable bodies while they
+are read.
+        """
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", ( chunk for chunk in [ "Hello ", "world" ] )))
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", ( chunk for chunk in [ "<img src='cid:lo", "go2' />" ] )))
+        message.add_content_id_alias("old", "new")
+
+        for content_id in ( "logo1", "logo2" ):
+            message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = content_id))
+        #
+
+        alternative_message = message_from_bytes(message.as_bytes()).get_payload(0)
+
+        self.assertEqual(b"Hello world", alternative_message.get_payload(0).get_payload(decode = True))
+        self.assertEqual(b"<img src='cid:logo1' />", alternative_message.get_payload(1).get_payload(decode = True))
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", [ "<img src='cid:old' />" ]))
+        message.add_content_id_alias("old", "new")
+
+        for _ in range(0, 2):
+            self.assertEqual(b"<img src='cid:new' />", message_from_bytes(message.as_bytes()).get_payload(decode = True))
+            message.subject = "Other test message"
+        #
+    #
+
+    def test_single_use_source_deduplication(self):
+        """
+Test that sources that can only be read once are not consumed to detect
+duplicates.
+        """
+
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"%PDF" * 250)
+        os.close(write_fd)
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/pdf", b"%PDF" * 250, file_name = "test.pdf"))
+
+        with os.fdopen(read_fd, "rb") as pipe:
+            message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/pdf", pipe, file_name = "test.pdf"))
+            self.assertEqual(2, len(message.attachment_list))
+
+            parsed_message = message_from_bytes(message.as_bytes())
+        #
+
+        self.assertEqual([ 1000, 1000 ], [ len(part.get_payload(decode = True)) for part in parsed_message.get_payload()[1:] ])
+    #
+
+    def test_concurrent_rendering(self):
+        """
+Test rendering a message from several threads while it is modified.
+        """
+
+        data = bytes(bytearray(range(0, 256))) * 1024
+
+        message = self._get_related_message()
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", BytesIO(data), file_name = "test.bin"))
+
+        addresses = [ "recipient{0:d}@localhost".format(i) for i in range(0, 50) ]
+
+        def add_recipients():
+            for address in addresses: message.add_to(address)
+        #
+
+        thread = Thread(target = add_recipients)
+
+        with ThreadRenderer(workers = 4) as renderer:
+            thread.start()
+            results = list(renderer.render([ message ] * 50))
+            thread.join()
+        #
+
+        for result in results:
+            parsed_message = message_from_bytes(result)
+            recipients = parsed_message['To'].split(", ")
+
+            if (recipients != [ "undisclosed-recipients" ]): self.assertEqual(addresses[:len(recipients)], recipients)
+            self.assertEqual(data, parsed_message.get_payload(2).get_payload(decode = True))
+        #
+
+        unpickled_message = pickle.loads(pickle.dumps(message))
+        self.assertEqual(", ".join(addresses), message_from_bytes(unpickled_message.as_bytes())['To'])
+    #
+
+    def test_deterministic(self):
+        """
+Test that identical messages are rendered to identical bytes in the
+deterministic mode.
+        """
+
+        messages = [ self._get_related_message(True) for _ in range(0, 2) ]
+
+        self.assertEqual(messages[0].body_related_list[0].content_id, messages[1].body_related_list[0].content_id)
+
+        for message in messages:
+            message.deterministic = True
+            message.set_header("Date", "Sun, 18 Oct 2026 12:00:00 +0000")
+        #
+
+        data = messages[0].as_bytes()
+
+        self.assertEqual(data, messages[1].as_bytes())
+        self.assertEqual(1, data.lower().count(b"\ndate: "))
+        self.assertEqual(3, len(set(re.findall(b'boundary="([^"]+)"', data))))
+
+        messages[1].add_to("recipient@localhost")
+        self.assertNotEqual(data, messages[1].as_bytes())
+
+        message = self._get_related_message()
+        self.assertNotEqual(messages[0].body_related_list[0].content_id, message.body_related_list[0].content_id)
+    #
+
+    def test_deterministic_single_use_sources(self):
+        """
+Test that sources that can only be read once are not consumed to derive
+Content-IDs and multipart boundaries.
+        """
+
+        pipes = [ ]
+
+        for data in ( b"%PDF" * 250, b"%PDF" * 250 ):
+            read_fd, write_fd = os.pipe()
+            os.write(write_fd, data)
+            os.close(write_fd)
+
+            pipes.append(os.fdopen(read_fd, "rb"))
+        #
+
+        attachments = [ Part(Part.TYPE_BINARY_ATTACHMENT, "application/pdf", pipe, file_name = "test.pdf", deterministic_content_id = True)
+                        for pipe in pipes
+                      ]
+
+        self.assertNotEqual(attachments[0].content_id, attachments[1].content_id)
+        self.assertEqual(b"%PDF" * 250, attachments[0].get_payload(decode = True))
+
+        message = Message()
+        message.deterministic = True
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", ( line for line in [ "Hello ", "world" ] )))
+        message.add_attachment(attachments[1])
+
+        parsed_message = message_from_bytes(message.as_bytes())
+        for pipe in pipes: pipe.close()
+
+        self.assertEqual(b"Hello world", parsed_message.get_payload(0).get_payload(decode = True))
+        self.assertEqual(b"%PDF" * 250, parsed_message.get_payload(1).get_payload(decode = True))
+        self.assertRaises(ValueError, lambda: attachments[1].content_digest)
+    #
+
+    def test_estimated_size(self):
+        """
+Test that the estimated size matches the formatted message exactly.
+        """
+
+        message = self._get_related_message()
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", BytesIO(b"\x00" * 100000), file_name = "test.bin"))
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", BytesIO("Schön\r\n".encode("utf-8") * 1000), file_name = "test.txt"))
+
+        for linesep in ( "\n", "\r\n" ):
+            size = message.estimated_size(linesep)
+            self.assertEqual(len(b"".join(message.iter_chunks(linesep))), size)
+            self.assertEqual(size, message.estimated_size(linesep))
+        #
+
+        message.freeze_body()
+        self.assertEqual(len(message.as_bytes("\r\n")), message.estimated_size("\r\n"))
+    #
+
+    def test_frozen_body(self):
+        """
+Test that frozen bodies are serialized once and shared with other messages.
+        """
+
+        message = self._get_related_message()
+        frozen_body = message.freeze_body()
+
+        self.assertTrue(frozen_body.is_frozen)
+        self.assertTrue(frozen_body is message.freeze_body())
+        self.assertRaises(ValueError, frozen_body.attach, Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+
+        data = message.as_string()
+        self.assertEqual([ "\n" ], list(frozen_body.frozen_bodies))
+
+        other_message = Message()
+        other_message.subject = "Other test message"
+        other_message.add_to("recipient@localhost")
+        other_message.frozen_body = frozen_body
+
+        other_data = other_message.as_string()
+        self.assertTrue(frozen_body.frozen_bodies["\n"].decode("ascii") in data)
+        self.assertTrue(frozen_body.frozen_bodies["\n"].decode("ascii") in other_data)
+        self.assertEqual(1, other_data.count("\nSubject: Other test message\n"))
+        self.assertEqual(None, frozen_body['Subject'])
+
+        other_message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt"))
+        self.assertTrue(frozen_body.frozen_bodies["\n"].decode("ascii") in other_message.as_string())
+
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        self.assertEqual(None, message.frozen_body)
+        self.assertRaises(TypeError, setattr, message, "frozen_body", Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello"))
+    #
+
+    def test_partial_messages(self):
+        """
+Test splitting a message into "message/partial" fragments and reassembling
+them.
+        """
+
+        message = self._get_related_message()
+        message.add_to("recipient@localhost")
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", b"\x00" * 100000, file_name = "test.bin"))
+
+        for linesep in ( "\n", "\r\n" ):
+            data = message.as_bytes(linesep)
+            fragments = list(message.iter_partial_messages(4096, linesep, "test@localhost"))
+
+            self.assertTrue(len(fragments) > 30)
+            self.assertTrue(max(len(fragment) for fragment in fragments) <= 4096)
+
+            parsed_fragments = [ message_from_bytes(fragment) for fragment in fragments ]
+
+            self.assertEqual([ "message/partial" ], list(set(fragment.get_content_type() for fragment in parsed_fragments)))
+            self.assertEqual(list(range(1, 1 + len(fragments))), [ int(fragment.get_param("number")) for fragment in parsed_fragments ])
+            self.assertEqual([ None ] * (len(fragments) - 1) + [ str(len(fragments)) ], [ fragment.get_param("total") for fragment in parsed_fragments ])
+            self.assertEqual("recipient@localhost", parsed_fragments[0]['To'])
+            self.assertEqual("Test message", parsed_fragments[-1]['Subject'])
+
+            reassembled_data = PartialMessage.reassemble(reversed(fragments))
+
+            self.assertEqual(len(data), len(reassembled_data))
+            self.assertEqual(data.split(linesep.encode("ascii") * 2, 1)[1], reassembled_data.split(linesep.encode("ascii") * 2, 1)[1])
+            self.assertEqual(sorted(message_from_bytes(data).items()), sorted(message_from_bytes(reassembled_data).items()))
+        #
+
+        self.assertRaises(ValueError, PartialMessage.reassemble, fragments[1:])
+        self.assertRaises(ValueError, list, message.iter_partial_messages(100))
+    #
+
+    def test_lazy_imports(self):
+        """
+Test that optional dependencies are not imported with the message module.
+        """
+
+        environment = os.environ.copy()
+        environment['PYTHONPATH'] = os.pathsep.join(sys.path)
+
+        lazy_module_names = ( "concurrent.futures", "dNG.data.rfc.basics", "email.parser", "hashlib", "multiprocessing", "uuid" )
+
+        code = ("import sys; import dNG.data.rfc.email.message; "
+                "print(' '.join(name for name in sorted(sys.modules) if name.startswith({0!r})))".format(lazy_module_names)
+               )
+
+        output = subprocess.check_output([ sys.executable, "-c", code ], env = environment)
+        self.assertEqual(b"", output.strip())
+    #
+
+    def test_as_string_8bit(self):
+        """
+Test that "8bit" bodies are decoded as UTF-8 by "as_string()".
+        """
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Grüße", transfer_encoding = "8bit"))
+
+        data = message.as_string()
+
+        self.assertTrue("Grüße" in data)
+        self.assertEqual(message.as_bytes(), data.encode("utf-8"))
+    #
+
+    def test_modification_tracking(self):
+        """
+Test that unchanged messages reuse the populated tree and the formatted
+message.
+        """
+
+        message = Message()
+        message.subject = "Test message"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt"))
+
+        data = message.as_string()
+        populated_message = message.message
+
+        self.assertEqual(data, message.as_string())
+        self.assertEqual(data.encode("ascii"), message.as_bytes())
+        self.assertEqual([ data.encode("ascii") ], list(message.iter_chunks()))
+        self.assertTrue(populated_message is message.message)
+
+        fp = BytesIO()
+        message.write_to(fp, "\r\n")
+
+        self.assertEqual(data.replace("\n", "\r\n").encode("ascii"), fp.getvalue())
+        self.assertTrue(populated_message is message.message)
+
+        message.add_to("recipient@localhost")
+        modified_data = message.as_string()
+
+        self.assertFalse(populated_message is message.message)
+        self.assertEqual(1, modified_data.count("\nTo: recipient@localhost\n"))
+        self.assertEqual(1, modified_data.count("\nSubject: "))
+    #
+
+    def test_recipients(self):
+        """
+Test adding recipients in bulk.
+        """
+
+        message = Message()
+        message.add_to("first@localhost")
+
+        addresses = [ "recipient{0:d}@localhost".format(i % 5000) for i in range(0, 10000) ]
+        message.add_recipients(addresses)
+        message.add_recipients(reversed(addresses), "bcc")
+
+        self.assertEqual(5001, len(message.to))
+        self.assertEqual("first@localhost", message.to[0])
+        self.assertEqual("recipient4999@localhost", message.bcc[0])
+        self.assertEqual(0, len(message.cc))
+        self.assertTrue(message.is_recipient_set)
+
+        self.assertRaises(TypeError, message.add_recipients, [ "cc@localhost", "" ], "cc")
+        self.assertEqual(0, len(message.cc))
+        self.assertRaises(ValueError, message.add_recipients, [ "cc@localhost" ], "from")
+
+        message.to = "first@localhost"
+        message.add_to("recipient0@localhost")
+        self.assertEqual([ "first@localhost", "recipient0@localhost" ], message.to)
+    #
+
+    def test_render_many(self):
+        """
+Test rendering messages in parallel.
+        """
+
+        messages = [ ]
+
+        for i in range(0, 20):
+            message = Message()
+            message.subject = "Test message {0:d}".format(i)
+            message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world {0:d}".format(i)))
+
+            messages.append(message)
+        #
+
+        results = list(Message.render_many(iter(messages), workers = 2))
+        self.assertEqual(20, len(results))
+
+        for i in range(0, 20):
+            self.assertTrue(b"Subject: Test message " + str(i).encode("ascii") + b"\n" in results[i])
+            self.assertTrue(results[i].endswith(b"Hello world " + str(i).encode("ascii")))
+        #
+    #
+
+    def test_storage_statistics(self):
+        """
+Test that large payloads and formatted messages are spooled to disk above
+the threshold.
+        """
+
+        data = os.urandom(1000000)
+
+        def get_message():
+            _return = self._get_related_message(True)
+            _return.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", data, file_name = "large.png", deterministic_content_id = True))
+
+            _return.deterministic = True
+            _return.set_header("Date", "Sun, 18 Oct 2026 12:00:00 +0000")
+
+            return _return
+        #
+
+        message = get_message()
+        expected_data = message.as_bytes("\r\n")
+        memory_size = message.storage_statistics['memory']
+
+        self.assertEqual(0, message.storage_statistics['disk'])
+        self.assertGreater(memory_size, len(expected_data) + len(data))
+
+        SpooledBuffer.set_threshold(65536)
+
+        try:
+            message = get_message()
+
+            self.assertTrue(isinstance(message.body_related_list[-1].storage_buffers[0], SpooledBuffer))
+            self.assertEqual(data, message.body_related_list[-1].get_payload(decode = True))
+
+            # Chunks are spooled while being formatted, so that only the
+            # returned copy of the message is held in memory as a whole.
+            tracemalloc.start()
+
+            try:
+                self.assertEqual(expected_data, message.as_bytes("\r\n"))
+                peak_size = tracemalloc.get_traced_memory()[1]
+            finally: tracemalloc.stop()
+
+            self.assertLess(peak_size, 1.5 * len(expected_data))
+            self.assertEqual(expected_data, b"".join(message.iter_chunks("\r\n")))
+            self.assertEqual(len(expected_data), message.estimated_size("\r\n"))
+
+            statistics = message.storage_statistics
+            self.assertLess(statistics['memory'], 65536)
+            self.assertEqual(memory_size - statistics['memory'], statistics['disk'])
+
+            frozen_body = message.freeze_body()
+            message.as_bytes()
+
+            self.assertTrue(isinstance(frozen_body.frozen_bodies["\n"], SpooledBuffer))
+            self.assertLess(message.storage_statistics['memory'], 65536)
+
+            message = pickle.loads(pickle.dumps(message))
+            self.assertEqual(data, message.body_related_list[-1].get_payload(decode = True))
+        finally: SpooledBuffer.set_threshold(None)
+    #
+
+    def test_write_to(self):
+        """
+Test streaming a multipart message to a binary file-like object.
+        """
+
+        messages = [ ]
+
+        for _ in range(0, 2):
+            message = Message()
+            message.subject = "We like German Umlauts to test UTF-8 öäü"
+            message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+            message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG\x00" * 64, file_name = "test.png"))
+            message.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt"))
+
+            messages.append(message)
+        #
+
+        fp = BytesIO()
+        messages[0].write_to(fp)
+
+        self.assertEqual(TestRfcEMailPart._get_unified_message_as_string(messages[1]),
+                         TestRfcEMailPart._get_unified_string(fp.getvalue().decode("ascii"))
+                        )
+
+        fp = BytesIO()
+        messages[0].write_to(fp, "\r\n")
+
+        self.assertTrue(b"\r\n\r\n" in fp.getvalue())
+        self.assertFalse(b"\n" in fp.getvalue().replace(b"\r\n", b""))
+    #
+
+    @staticmethod
+    def _get_related_message(deterministic_content_id = False):
+        """
+Returns a message with alternative bodies, a related part and an
+attachment.
+
+:param deterministic_content_id: True to derive Content-IDs from the part
+                                 content
+
+:return: (object) Message instance
+        """
+
+        _return = Message()
+        _return.subject = "Test message"
+        _return.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        _return.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<img src='cid:image' />"))
+        _return.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "image.png", deterministic_content_id = deterministic_content_id))
+        _return.add_attachment(Part(Part.TYPE_ATTACHMENT, "text/plain", "Hello world", file_name = "test.txt", deterministic_content_id = deterministic_content_id))
+
+        return _return
+    #
+
     @staticmethod
     def _get_unified_message_as_string(message):
         """
@@ -162,7 +696,19 @@ Returns the message in a unified (but not standard conform) way.
 :return: (str) Unified formatted message
         """
 
-        _return = re.sub("===============\\d+==", "===============x==", message.as_string())
+        return TestRfcEMailPart._get_unified_string(message.as_string())
+    #
+
+    @staticmethod
+    def _get_unified_string(value):
+        """
+Returns the given formatted message in a unified (but not standard conform)
+way.
+
+:return: (str) Unified formatted message
+        """
+
+        _return = re.sub("===============\\d+==", "===============x==", value)
         _return = re.sub("\n boundary=\"===============x==\"\n", " boundary=\"===============x==\"\n", _return)
         _return = re.sub("^Content-ID: <cid\\d+@mail>$", "Content-ID: <cidx@mail>", _return, flags = re.M)
         _return = re.sub("^Date: \\w{3}, \\d{2} \\w{3} \\d{4} \\d{2}:\\d{2}:\\d{2} GMT$", "Date: Thu, 01 Jan 1970 00:00:00 GMT", _return, flags = re.M)
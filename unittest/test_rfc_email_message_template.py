@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?rfc;email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+from email import message_from_string, policy
+import unittest
+
+from dNG.data.rfc.email.message import Message
+from dNG.data.rfc.email.message_template import MessageTemplate
+from dNG.data.rfc.email.part import Part
+
+class TestRfcEMailMessageTemplate(unittest.TestCase):
+    def test_render(self):
+        """
+Test rendering per-recipient messages from a template.
+        """
+
+        message = Message()
+        message.sender = "sender@localhost"
+        message.subject = "Hello ${name}"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Costs: $10"))
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<p>Hallo ${name}, schön dich zu sehen.</p>"))
+        message.add_attachment(Part(Part.TYPE_BINARY_ATTACHMENT, "application/pdf", b"%PDF-1.4", file_name = "terms.pdf"))
+
+        template = MessageTemplate(message)
+
+        first_message = template.render({ "name": "Alice" }, to = "alice@localhost")
+        second_message = template.render({ "name": "Bob" }, to = [ "bob@localhost", "bob@example.com" ])
+
+        self.assertEqual("Hello Alice", first_message.subject)
+        self.assertEqual([ "bob@localhost", "bob@example.com" ], second_message.to)
+
+        self.assertTrue(first_message.body_list[0] is second_message.body_list[0])
+        self.assertFalse(first_message.body_list[1] is second_message.body_list[1])
+        self.assertTrue(first_message.attachment_list[0] is message.attachment_list[0])
+
+        for _ in range(0, 2):
+            parsed_message = message_from_string(second_message.as_string())
+
+            self.assertEqual([ "bob@localhost, bob@example.com" ], parsed_message.get_all("To"))
+            self.assertEqual("<p>Hallo Bob, schön dich zu sehen.</p>",
+                             parsed_message.get_payload(0).get_payload(1).get_payload(decode = True).decode("utf-8")
+                            )
+        #
+    #
+
+    def test_transfer_encoding(self):
+        """
+Test that the Content-Transfer-Encoding mode of template bodies is kept.
+        """
+
+        message = Message()
+        message.subject = "Hello"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello ${name}\n", transfer_encoding = Part.TRANSFER_ENCODING_AUTO_8BIT))
+
+        template = MessageTemplate(message)
+
+        for name, transfer_encoding in ( ( "alice", "7bit" ), ( "Zoë", "8bit" ) ):
+            parsed_message = message_from_string(template.render({ "name": name }).as_string())
+            self.assertEqual(transfer_encoding, parsed_message['Content-Transfer-Encoding'])
+        #
+    #
+
+    def test_shared_single_body(self):
+        """
+Test that rendering messages does not modify shared message body parts.
+        """
+
+        message = Message()
+        message.subject = "Hello"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+
+        template = MessageTemplate(message)
+
+        for address in ( "alice@localhost", "bob@localhost" ):
+            parsed_message = message_from_string(template.render(to = address).as_string())
+            self.assertEqual([ address ], parsed_message.get_all("To"))
+        #
+
+        self.assertEqual(None, message.body_list[0]['To'])
+    #
+
+    def test_content_id_aliases(self):
+        """
+Test that Content-ID aliases of deduplicated parts are kept by templates.
+        """
+
+        message = Message()
+        message.subject = "Hello"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<p>${name}</p><img src='cid:logo1' /><img src='cid:logo2' />"))
+
+        for content_id in ( "logo1", "logo2" ):
+            message.add_body_related_attachment(Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "logo.png", content_id = content_id))
+        #
+
+        template = MessageTemplate(message)
+        self.assertEqual({ "logo2": "logo1" }, template.content_id_aliases)
+
+        parsed_message = message_from_string(template.render({ "name": "alice" }).as_string())
+
+        self.assertEqual(2, len(parsed_message.get_payload()))
+        self.assertEqual(b"<p>alice</p><img src='cid:logo1' /><img src='cid:logo1' />", parsed_message.get_payload(0).get_payload(decode = True))
+    #
+
+    def test_message_settings(self):
+        """
+Test that the deterministic mode and the policy are kept by templates.
+        """
+
+        message = Message()
+        message.subject = "Hello ${name}"
+        message.deterministic = True
+        message.set_header("Date", "Sun, 18 Oct 2026 12:00:00 +0000")
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<p>Hello world</p>"))
+
+        template = MessageTemplate(message)
+
+        self.assertTrue(template.render({ "name": "alice" }).deterministic)
+        self.assertEqual(template.render({ "name": "alice" }).as_bytes(), template.render({ "name": "alice" }).as_bytes())
+
+        message.policy = policy.SMTPUTF8
+        rendered_message = MessageTemplate(message).render({ "name": "Zoë" })
+
+        self.assertTrue(policy.SMTPUTF8 is rendered_message.policy)
+        self.assertIn("Subject: Hello Zoë\n".encode("utf-8"), rendered_message.as_bytes())
+    #
+
+    def test_non_utf8_body(self):
+        """
+Test that bodies not encoded in UTF-8 are shared.
+        """
+
+        message = Message()
+        message.subject = "Hello ${name}"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Schön, ${name}".encode("iso-8859-1")))
+
+        template = MessageTemplate(message)
+        self.assertTrue(template.is_body_shared)
+
+        parsed_message = message_from_string(template.render({ "name": "alice" }).as_string())
+
+        self.assertEqual("Hello alice", parsed_message['Subject'])
+        self.assertEqual("Schön, ${name}".encode("iso-8859-1"), parsed_message.get_payload(decode = True))
+    #
+
+    def test_frozen_body(self):
+        """
+Test that a body without placeholders is frozen and shared.
+        """
+
+        message = Message()
+        message.subject = "Hello ${name}"
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world"))
+        message.add_body(Part(Part.TYPE_MESSAGE_BODY, "text/html", "<p>Hello world</p>"))
+
+        template = MessageTemplate(message)
+        self.assertTrue(template.is_body_shared)
+
+        messages = [ template.render({ "name": name }, to = name + "@localhost") for name in ( "alice", "bob" ) ]
+
+        self.assertTrue(messages[0].frozen_body is messages[1].frozen_body)
+        self.assertTrue(messages[0].frozen_body.is_frozen)
+
+        for name, message in zip(( "alice", "bob" ), messages):
+            parsed_message = message_from_string(message.as_string())
+
+            self.assertEqual("Hello " + name, parsed_message['Subject'])
+            self.assertEqual([ name + "@localhost" ], parsed_message.get_all("To"))
+            self.assertEqual("multipart/alternative", parsed_message.get_content_type())
+            self.assertEqual(b"<p>Hello world</p>", parsed_message.get_payload(1).get_payload(decode = True))
+        #
+
+        message.body_list[0] = Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello ${name}")
+        self.assertFalse(MessageTemplate(message).is_body_shared)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#
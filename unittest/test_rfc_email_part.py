@@ -17,6 +17,12 @@ https://www.direct-netware.de/redirect?licenses;mpl2
 #echo(__FILEPATH__)#
 """
 
+from base64 import b64decode, encodebytes
+from io import BytesIO
+from os import path
+from quopri import decodestring, encodestring
+from tempfile import TemporaryDirectory
+import re
 import unittest
 
 from dNG.data.rfc.email.part import Part
@@ -58,6 +64,170 @@ Test basic methods for an ASCII inline part.
 
         self.assertTrue(isinstance(_exception, TypeError))
     #
+
+    def test_bytes_payload(self):
+        """
+Test that payloads are kept as transfer encoded bytes.
+        """
+
+        data = b"\x89PNG\x00" * 64
+        part = Part(Part.TYPE_BINARY_INLINE, "image/png", data, file_name = "test.png")
+
+        encoded_data = encodebytes(data)[:-1]
+
+        self.assertEqual([ encoded_data ], list(part.iter_encoded_payload()))
+        self.assertEqual(encoded_data.decode("ascii"), part.get_payload())
+        self.assertEqual(data, part.get_payload(decode = True))
+        self.assertTrue(part.as_bytes().endswith(b"\n\n" + encoded_data))
+        self.assertEqual(part.as_bytes().decode("ascii"), part.as_string())
+    #
+
+    def test_transfer_encoding_selection(self):
+        """
+Test the automatic and forced Content-Transfer-Encoding selection.
+        """
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world\n", transfer_encoding = Part.TRANSFER_ENCODING_AUTO)
+        self.assertEqual("7bit", part['Content-Transfer-Encoding'])
+        self.assertEqual(b"Hello world\n", part.get_payload(decode = True))
+
+        data = "Hallo Welt, schön das du dich drehst.\n"
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", data, transfer_encoding = Part.TRANSFER_ENCODING_AUTO)
+        self.assertEqual("quoted-printable", part['Content-Transfer-Encoding'])
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", data, transfer_encoding = Part.TRANSFER_ENCODING_AUTO_8BIT)
+        self.assertEqual("8bit", part['Content-Transfer-Encoding'])
+        self.assertEqual(data.encode("utf-8"), part.get_payload(decode = True))
+        self.assertTrue(part.as_bytes().endswith(data.encode("utf-8")))
+
+        data = "Привет мир\n" * 16
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", data, transfer_encoding = Part.TRANSFER_ENCODING_AUTO)
+        self.assertEqual("base64", part['Content-Transfer-Encoding'])
+        self.assertEqual(data.encode("utf-8"), part.get_payload(decode = True))
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", "x" * 1000, transfer_encoding = Part.TRANSFER_ENCODING_AUTO_8BIT)
+        self.assertEqual("quoted-printable", part['Content-Transfer-Encoding'])
+
+        part = Part(Part.TYPE_BINARY_ATTACHMENT, "text/csv", b"a,b\n", file_name = "test.csv", transfer_encoding = Part.TRANSFER_ENCODING_AUTO)
+        self.assertEqual("base64", part['Content-Transfer-Encoding'])
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", "Hello world\n", transfer_encoding = "base64")
+        self.assertEqual("base64", part['Content-Transfer-Encoding'])
+        self.assertEqual(b"Hello world\n", part.get_payload(decode = True))
+
+        self.assertRaises(ValueError, Part, Part.TYPE_MESSAGE_BODY, "text/plain", "schön", transfer_encoding = "7bit")
+        self.assertRaises(ValueError, Part, Part.TYPE_MESSAGE_BODY, "text/plain", "Hello", transfer_encoding = "binary")
+
+        self.assertRaises(ValueError,
+                          Part,
+                          Part.TYPE_ATTACHMENT,
+                          "text/plain",
+                          BytesIO(b"Hello world"),
+                          file_name = "test.txt",
+                          transfer_encoding = "8bit"
+                         )
+    #
+
+    def test_content_id(self):
+        """
+Test explicit and content derived Content-IDs.
+        """
+
+        part = Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "test.png", content_id = "logo@localhost")
+        self.assertEqual("logo@localhost", part.content_id)
+        self.assertEqual("<logo@localhost>", part['Content-ID'])
+
+        content_ids = [ Part(Part.TYPE_BINARY_INLINE, "image/png", data, file_name = "test.png", deterministic_content_id = True).content_id
+                        for data in ( b"\x89PNG", b"\x89PNG", b"\x89PNG\x00" )
+                      ]
+
+        self.assertEqual(content_ids[0], content_ids[1])
+        self.assertNotEqual(content_ids[0], content_ids[2])
+
+        # Deterministic Content-IDs are a per part option
+        part = Part(Part.TYPE_BINARY_INLINE, "image/png", b"\x89PNG", file_name = "test.png")
+        self.assertEqual("cid{0:d}@mail".format(id(part)), part.content_id)
+    #
+
+    def test_encoded_size(self):
+        """
+Test the calculation of transfer encoded payload sizes.
+        """
+
+        for data in ( b"", b"a", b"\x00" * 57, b"\x00" * 58, bytes(bytearray(range(0, 256))) * 1000 ):
+            part = Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", data, file_name = "test.bin")
+            source_part = Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", BytesIO(data), file_name = "test.bin")
+
+            for linesep in ( "\n", "\r\n" ):
+                size = len(b"".join(part.iter_encoded_payload()).replace(b"\n", linesep.encode("ascii")))
+
+                self.assertEqual(size, part.encoded_size(linesep))
+                self.assertEqual(size, source_part.encoded_size(linesep))
+            #
+        #
+
+        part = Part(Part.TYPE_ATTACHMENT, "text/plain", BytesIO("Schön\r\n".encode("utf-8") * 1000), file_name = "test.txt")
+        self.assertEqual(len(re.sub(b"\r\n|\r|\n", b"\r\n", b"".join(part.iter_encoded_payload()))), part.encoded_size("\r\n"))
+    #
+
+    def test_iterable_body(self):
+        """
+Test message bodies given as iterable of chunks.
+        """
+
+        chunks = [ "Hallo Welt, schön das du dich drehst. \n" * 100, b"=" * 100, "\n", "" ]
+        data = b"".join((chunk if (type(chunk) is bytes) else chunk.encode("utf-8")) for chunk in chunks)
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", chunks)
+        self.assertTrue(part.is_source_based)
+        self.assertEqual("quoted-printable", part['Content-Transfer-Encoding'])
+        self.assertEqual(encodestring(data), b"".join(part.iter_encoded_payload()))
+        self.assertEqual(data, part.get_payload(decode = True))
+
+        part = Part(Part.TYPE_MESSAGE_BODY, "text/plain", iter(chunks))
+        self.assertRaises(ValueError, part.encoded_size)
+        self.assertEqual(encodestring(data), b"".join(part.iter_encoded_payload()))
+        self.assertRaises(ValueError, lambda: b"".join(part.iter_encoded_payload()))
+
+        self.assertRaises(TypeError, Part, Part.TYPE_ATTACHMENT, "text/plain", chunks, file_name = "test.txt")
+    #
+
+    def test_source_based_attachment(self):
+        """
+Test attachments read from file-like objects and files on demand.
+        """
+
+        data = bytes(bytearray(range(0, 256))) * 1024
+        part = Part(Part.TYPE_BINARY_ATTACHMENT, "application/octet-stream", BytesIO(data), file_name = "test.bin")
+
+        self.assertTrue(part.is_source_based)
+
+        encoded_data = b"".join(part.iter_encoded_payload())
+        self.assertEqual(data, b64decode(encoded_data))
+        self.assertEqual(76, max(len(line) for line in encoded_data.split(b"\n")))
+        self.assertEqual(encoded_data, b"".join(part.iter_encoded_payload()))
+
+        data = ("Hallo Welt, schön das du dich drehst.\n" * 4096 + "x" * 200000).encode("utf-8")
+
+        with TemporaryDirectory() as directory_path:
+            file_path_name = path.join(directory_path, "hallo_welt.txt")
+            with open(file_path_name, "wb") as file_obj: file_obj.write(data)
+
+            part = Part(Part.TYPE_ATTACHMENT, "text/plain", file_path_name = file_path_name)
+            self.assertEqual('attachment; filename="hallo_welt.txt"', part['Content-Disposition'])
+
+            encoded_data = b"".join(part.iter_encoded_payload())
+            self.assertEqual(data, decodestring(encoded_data))
+            self.assertTrue(max(len(line) for line in encoded_data.split(b"\n")) <= 76)
+            self.assertEqual(data, part.get_payload(decode = True))
+        #
+
+        data = data[:4096 * 39]
+        part = Part(Part.TYPE_ATTACHMENT, "text/plain", BytesIO(data), file_name = "hallo_welt.txt")
+        self.assertEqual(encodestring(data), b"".join(part.iter_encoded_payload()))
+    #
 #
 
 if (__name__ == "__main__"):
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+RFC e-mail for Python
+An abstracted programming interface to generate e-mails
+----------------------------------------------------------------------------
+(C) direct Netware Group - All rights reserved
+https://www.direct-netware.de/redirect?py;rfc_email
+
+This Source Code Form is subject to the terms of the Mozilla Public License,
+v. 2.0. If a copy of the MPL was not distributed with this file, You can
+obtain one at http://mozilla.org/MPL/2.0/.
+----------------------------------------------------------------------------
+https://www.direct-netware.de/redirect?licenses;mpl2
+----------------------------------------------------------------------------
+#echo(rfcEMailVersion)#
+#echo(__FILEPATH__)#
+"""
+
+import pickle
+import unittest
+
+from dNG.data.rfc.email.spooled_buffer import SpooledBuffer
+
+class TestRfcEMailSpooledBuffer(unittest.TestCase):
+    def test_join(self):
+        """
+Test that only data larger than the threshold is returned spooled.
+        """
+
+        self.assertEqual(b"Hello world", SpooledBuffer.join([ b"Hello ", b"world" ]))
+
+        SpooledBuffer.set_threshold(8)
+
+        try:
+            self.assertEqual(b"Hello", SpooledBuffer.join([ b"Hel", b"lo" ]))
+
+            buffer = SpooledBuffer.join([ b"Hello ", b"world" ])
+            self.assertTrue(isinstance(buffer, SpooledBuffer))
+            self.assertEqual(( 0, 11 ), SpooledBuffer.get_storage_sizes(buffer))
+            self.assertEqual(( 5, 0 ), SpooledBuffer.get_storage_sizes(b"Hello"))
+        finally: SpooledBuffer.set_threshold(None)
+
+        self.assertRaises(TypeError, SpooledBuffer.set_threshold, "8")
+        self.assertRaises(ValueError, SpooledBuffer.set_threshold, -1)
+    #
+
+    def test_spooling(self):
+        """
+Test that data is held in memory up to the threshold and read back in
+blocks not splitting line endings.
+        """
+
+        buffer = SpooledBuffer(16)
+        buffer.write(b"Hello world\r\n")
+
+        self.assertFalse(buffer.is_on_disk)
+        self.assertEqual(13, buffer.memory_size)
+
+        data = b"x" * (SpooledBuffer.BLOCK_SIZE - 14) + b"\r\n" + b"y" * SpooledBuffer.BLOCK_SIZE
+        buffer.write(data)
+
+        self.assertTrue(buffer.is_on_disk)
+        self.assertEqual(0, buffer.memory_size)
+        self.assertEqual(13 + len(data), buffer.disk_size)
+        self.assertEqual(len(buffer), buffer.disk_size)
+
+        blocks = list(buffer.iter_blocks())
+        self.assertEqual(b"Hello world\r\n" + data, b"".join(blocks))
+        self.assertTrue(blocks[1].startswith(b"\r\n"))
+
+        buffer = pickle.loads(pickle.dumps(buffer))
+        self.assertTrue(buffer.is_on_disk)
+        self.assertEqual(b"Hello world\r\n" + data, buffer.getvalue())
+
+        buffer.close()
+        self.assertEqual(0, len(buffer))
+
+        buffer = SpooledBuffer(0)
+        buffer.write(b"Hello")
+        self.assertEqual(5, buffer.disk_size)
+    #
+#
+
+if (__name__ == "__main__"):
+    unittest.main()
+#